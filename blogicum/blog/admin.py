@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Post, Category, Location, Comment
+from .models import Post, Category, Location, Comment, OutgoingEmail, Job
+from .search import search
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -42,6 +43,7 @@ class PostAdmin(admin.ModelAdmin):
                     'location',
                     'category',
                     'created_at',
+                    'comment_count',
                     )
     list_editable = (
         'is_published',
@@ -62,8 +64,50 @@ class PostAdmin(admin.ModelAdmin):
         'category'
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search(queryset, search_term), False
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject',
+        'recipients',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at'
+    )
+    list_filter = (
+        'status',
+    )
+    search_fields = [
+        'dedupe_key',
+    ]
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'task',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'locked_by',
+        'finished_at'
+    )
+    list_filter = (
+        'status',
+        'task'
+    )
+    search_fields = [
+        'idempotency_key',
+    ]
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Comment)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,63 @@
+"""
+SQLite с настройками для нескольких процессов-обработчиков.
+
+При подключении выполняются PRAGMA из ``DEFAULT_PRAGMAS``, дополненные
+``OPTIONS['pragmas']``: журнал WAL не блокирует чтение на время записи,
+а ``busy_timeout`` заставляет ждать чужую запись вместо ошибки
+«database is locked». Транзакции ``atomic()`` открываются как
+``BEGIN IMMEDIATE`` (``OPTIONS['transaction_mode']``): блокировка записи
+берётся сразу, и транзакции, которые читают, а затем пишут, не падают
+при одновременном повышении блокировки.
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -16000,
+    'temp_store': 'MEMORY',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+PRAGMA_VALUE_RE = re.compile(r'-?\w+')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        options = self.settings_dict['OPTIONS']
+        pragmas = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        for name, value in pragmas.items():
+            if not (
+                name.isidentifier()
+                and PRAGMA_VALUE_RE.fullmatch(str(value))
+            ):
+                raise ImproperlyConfigured(
+                    f'Недопустимая PRAGMA для SQLite: {name} = {value!r}.'
+                )
+        self.pragmas = pragmas
+        self.transaction_mode = options.get(
+            'transaction_mode', 'IMMEDIATE'
+        ).upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                'transaction_mode для SQLite должен быть одним из: '
+                + ', '.join(TRANSACTION_MODES)
+            )
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,85 @@
+import hashlib
+import uuid
+
+from django.core.cache import cache
+
+from .profiling import record_cache_access
+
+
+def _version(obj):
+    if obj is None:
+        return '-'
+    return str(obj.updated_at.timestamp())
+
+
+def post_card_cache_key(post):
+    """
+    Ключ карточки публикации.
+
+    Включает версии публикации и связанных категории и местоположения,
+    поэтому любое их сохранение (и изменение комментариев, обновляющее
+    ``Post.updated_at``) делает старую карточку недостижимой.
+    """
+    parts = (
+        str(post.pk),
+        _version(post),
+        _version(post.category),
+        _version(post.location),
+        post.author.username,
+    )
+    digest = hashlib.md5(':'.join(parts).encode()).hexdigest()
+    return f'blog:post_card:{post.pk}:{digest}'
+
+
+def get_or_render(key, render, timeout=None):
+    html = cache.get(key)
+    record_cache_access(html is not None)
+    if html is None:
+        html = render()
+        cache.set(key, html, timeout)
+    return html
+
+
+def _tag_key(tag):
+    return f'blog:tag:{tag}'
+
+
+def tag_versions(tags):
+    """
+    Текущие версии тегов страниц.
+
+    Отсутствующая в кэше версия создаётся заново случайной, поэтому
+    вытеснение версии из кэша не может «воскресить» старую страницу.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    cache.set_many(
+        {_tag_key(tag): uuid.uuid4().hex for tag in tags}, None
+    )
+
+
+def page_cache_key(request, tags):
+    query = sorted(request.GET.lists())
+    parts = [request.path, repr(query)] + tag_versions(tags)
+    digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+    return f'blog:page:{digest}'
+
+
+def feed_tag():
+    return 'feed'
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def post_tag(post_id):
+    return f'post:{post_id}'
@@ -0,0 +1,36 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Post
+
+
+def actual_comment_count():
+    """Подзапрос с фактическим числом комментариев публикации."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def recount_comments(queryset=None):
+    """
+    Пересчитывает ``Post.comment_count`` одним UPDATE для публикаций,
+    у которых счётчик разошёлся с фактическим числом комментариев.
+    Возвращает число исправленных публикаций.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    drifted = queryset.annotate(
+        actual=actual_comment_count()
+    ).filter(~Q(comment_count=F('actual'))).values('pk')
+    # Подзапросом, а не списком: список id упёрся бы в предел
+    # параметров запроса у больших расхождений.
+    return Post.objects.using(queryset.db).filter(
+        pk__in=Subquery(drifted)
+    ).update(comment_count=actual_comment_count())
@@ -0,0 +1,106 @@
+"""
+Жизненный цикл соединений с базой в процессах WSGI-сервера.
+
+Соединение живёт ``CONN_MAX_AGE`` секунд из ``DATABASES`` и переходит
+от запроса к запросу. Перед повторным использованием оно проверяется
+запросом ``SELECT 1`` напрямую через драйвер, в обход обёрток Django:
+упавшее соединение закрывается, и запрос откроет новое вместо ошибки
+посреди страницы (``BLOG_CONN_HEALTH_CHECKS``). Счётчики открытых,
+переиспользованных, закрытых и упавших соединений каждого процесса
+попадают в ``blog.metrics``.
+"""
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import store
+
+COUNTERS = (
+    'db_connections_opened_total',
+    'db_connections_reused_total',
+    'db_connections_closed_total',
+    'db_connections_dead_total',
+)
+
+_open = weakref.WeakSet()
+
+
+def _labels(connection):
+    return {'alias': connection.alias}
+
+
+def _forget_closed():
+    for connection in list(_open):
+        if connection.connection is None:
+            _open.discard(connection)
+            store.inc('db_connections_closed_total', _labels(connection))
+            store.add_gauge('db_connections_open', _labels(connection), -1)
+
+
+def _is_alive(connection):
+    try:
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+def check_connections():
+    """Проверяет соединения, оставшиеся от прошлого запроса."""
+    _forget_closed()
+    health_checks = getattr(settings, 'BLOG_CONN_HEALTH_CHECKS', True)
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if health_checks and not _is_alive(connection):
+            store.inc('db_connections_dead_total', _labels(connection))
+            try:
+                connection.close()
+            except Exception:
+                connection.connection = None
+            _forget_closed()
+            continue
+        store.inc('db_connections_reused_total', _labels(connection))
+
+
+def worker_stats():
+    """Счётчики соединений этого процесса по псевдонимам баз."""
+    stats = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    with store.lock:
+        counters = list(store.counters.items())
+        gauges = list(store.gauges.items())
+    for (name, labels), value in counters:
+        if name in COUNTERS:
+            stats[dict(labels)['alias']][name] = int(value)
+    for (name, labels), value in gauges:
+        if name == 'db_connections_open':
+            stats[dict(labels)['alias']]['open'] = int(value)
+    return dict(stats)
+
+
+@receiver(connection_created)
+def count_new_connection(sender, connection, **kwargs):
+    _open.add(connection)
+    store.inc('db_connections_opened_total', _labels(connection))
+    store.add_gauge('db_connections_open', _labels(connection), 1)
+
+
+# Регистрируются после close_old_connections Django: к этому моменту
+# устаревшие соединения уже закрыты.
+@receiver(request_started)
+def check_connections_on_request(sender, **kwargs):
+    check_connections()
+
+
+@receiver(request_finished)
+def count_closed_connections(sender, **kwargs):
+    _forget_closed()
@@ -1,12 +1,15 @@
 from django import forms
-from django.core.mail import send_mail
+from django.db import transaction
 from .models import Post, Comment, User
+from .outbox import enqueue_email
+from .uploads import UploadImageField
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author', 'is_published',)
+        field_classes = {'image': UploadImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 format=(
@@ -15,20 +18,20 @@ class PostForm(forms.ModelForm):
             )
         }
 
-    def clean(self):
-        super().clean()
-        title = self.cleaned_data['title']
-        category = self.cleaned_data['category']
-        pub_date = self.cleaned_data['pub_date']
-        send_mail(
-            subject='Новый ПОСТ!!!!',
-            message=f'Название: {title} '
-                    f'Категория: {category}'
-                    f'Дата публикации:{pub_date}',
-            from_email='from@example.com',
-            recipient_list=['to@example.com'],
-            fail_silently=True,
-        )
+    @transaction.atomic
+    def save(self, commit=True):
+        post = super().save(commit)
+        if commit:
+            enqueue_email(
+                dedupe_key=f'post-created:{post.pk}',
+                subject='Новый ПОСТ!!!!',
+                body=f'Название: {post.title} '
+                     f'Категория: {post.category}'
+                     f'Дата публикации:{post.pub_date}',
+                from_email='from@example.com',
+                recipient_list=['to@example.com'],
+            )
+        return post
 
 
 class UserForm(forms.ModelForm):
@@ -0,0 +1,90 @@
+"""
+Уменьшенные копии фотографий публикаций.
+
+Для каждого загруженного фото рядом с оригиналом сохраняются варианты
+``thumb`` (карточки в лентах) и ``medium`` (страница публикации) в JPEG
+и WebP: ``post_images/photo.jpg`` → ``post_images/photo.thumb.webp`` и т. д.
+Шаблоны перечисляют варианты в ``srcset``, и браузер скачивает копию
+нужной ширины вместо оригинала.
+"""
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = {
+    'thumb': 640,
+    'medium': 1280,
+}
+FORMATS = {
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+
+def variant_name(name, variant, extension):
+    root, _ = posixpath.splitext(name)
+    return f'{root}.{variant}.{extension}'
+
+
+def variant_names(name):
+    return [
+        variant_name(name, variant, extension)
+        for variant in VARIANT_WIDTHS
+        for extension in FORMATS
+    ]
+
+
+def _encode(image, extension):
+    image_format, options = FORMATS[extension]
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        if 'A' in image.getbands():
+            background.paste(image, mask=image.getchannel('A'))
+        else:
+            background.paste(image.convert('RGB'))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file):
+    """
+    Сохраняет варианты фото рядом с оригиналом. Возвращает False, если
+    оригинал недоступен, не является изображением или копию не удалось
+    сохранить под ожидаемым именем.
+    """
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name, 'rb') as fh:
+            original = Image.open(fh)
+            original.load()
+    except (OSError, ValueError):
+        return False
+    original = ImageOps.exif_transpose(original)
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert(
+            'RGBA' if 'transparency' in original.info else 'RGB'
+        )
+    for variant, width in VARIANT_WIDTHS.items():
+        image = original.copy()
+        image.thumbnail((width, width * 3), Image.Resampling.LANCZOS)
+        for extension in FORMATS:
+            name = variant_name(field_file.name, variant, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            # Копия называется от имени оригинала, даже если сам
+            # оригинал сохранён до перехода на имена по содержимому.
+            save = getattr(storage, 'save_exact', storage.save)
+            saved = save(name, ContentFile(_encode(image, extension)))
+            if saved != name:
+                storage.delete(saved)
+                return False
+    return True
+
+
+def delete_variants(storage, name):
+    for variant in variant_names(name):
+        storage.delete(variant)
@@ -0,0 +1,183 @@
+"""
+Очередь фоновых задач в базе данных.
+
+Функция-задача регистрируется декоратором ``task`` и ставится в очередь
+вызовом ``enqueue``; команда ``runworker`` забирает задачи, срок которых
+наступил, и выполняет их в пуле из ``JOBS_CONCURRENCY`` процессов.
+Задача с ``idempotency_key`` попадает в очередь один раз. Упавшая задача
+повторяется с удваивающейся паузой до ``max_attempts`` попыток, а задача,
+оставшаяся у погибшего обработчика дольше ``JOBS_LOCK_TIMEOUT`` секунд,
+возвращается в очередь. При ``JOBS_EAGER`` задача выполняется сразу
+в вызывающем процессе — для тестов и разработки.
+"""
+import datetime as dt
+import multiprocessing
+import os
+import socket
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+_tasks = {}
+
+
+def task(name, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу под именем ``name``."""
+    def register(func):
+        _tasks[name] = (func, max_attempts)
+        func.task_name = name
+        return func
+    return register
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'JOBS_RETRY_DELAY', 30)
+    return dt.timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def enqueue(task_name, kwargs=None, idempotency_key=None, delay=None):
+    """
+    Ставит задачу в очередь. Аргументы ``kwargs`` и результат задачи
+    должны сериализоваться в JSON. Повторная постановка с тем же
+    ``idempotency_key`` возвращает уже созданную задачу.
+    """
+    if task_name not in _tasks:
+        raise LookupError(f'Фоновая задача {task_name!r} не объявлена.')
+    _, max_attempts = _tasks[task_name]
+    fields = {
+        'task': task_name,
+        'kwargs': kwargs or {},
+        'max_attempts': (
+            max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 3)
+        ),
+        'next_attempt_at': timezone.now() + (delay or dt.timedelta()),
+    }
+    if idempotency_key is None:
+        job, created = Job.objects.create(**fields), True
+    else:
+        job, created = Job.objects.get_or_create(
+            idempotency_key=idempotency_key, defaults=fields
+        )
+    if created and getattr(settings, 'JOBS_EAGER', False):
+        worker = worker_id()
+        if claim_job(job.pk, worker):
+            execute(job.pk, worker)
+        job.refresh_from_db()
+    return job
+
+
+def _due():
+    now = timezone.now()
+    stale = now - dt.timedelta(
+        seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', 600)
+    )
+    return (
+        Q(status=Job.PENDING, next_attempt_at__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale)
+    )
+
+
+def claim_job(pk, worker):
+    """Берёт задачу в работу, если её не опередил другой обработчик."""
+    return Job.objects.filter(_due(), pk=pk).update(
+        status=Job.RUNNING,
+        locked_by=worker,
+        locked_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    ) == 1
+
+
+def claim(worker, limit):
+    """Берёт в работу до ``limit`` наступивших задач, возвращает их id."""
+    claimed = []
+    candidates = Job.objects.filter(_due()).values_list('pk', flat=True)
+    for pk in candidates[:limit * 2]:
+        if claim_job(pk, worker):
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def execute(pk, worker):
+    """Выполняет взятую задачу и сохраняет итог; возвращает статус."""
+    job = Job.objects.get(pk=pk)
+    now = timezone.now()
+    changes = {'locked_by': '', 'locked_at': None}
+    try:
+        if job.task not in _tasks:
+            raise LookupError(f'Фоновая задача {job.task!r} не объявлена.')
+        func, _ = _tasks[job.task]
+        result = func(**job.kwargs)
+    except Exception as error:
+        changes['last_error'] = f'{type(error).__name__}: {error}'
+        if job.attempts >= job.max_attempts:
+            changes.update(status=Job.FAILED, finished_at=now)
+        else:
+            changes.update(
+                status=Job.PENDING,
+                next_attempt_at=now + retry_delay(job.attempts),
+            )
+    else:
+        changes.update(
+            status=Job.DONE, result=result, finished_at=now, last_error='',
+        )
+    # Итог записывает только тот, кто держит задачу: если её отобрали
+    # как зависшую, победит новый обработчик.
+    Job.objects.filter(pk=pk, locked_by=worker).update(**changes)
+    return changes['status']
+
+
+def run_pending(concurrency=None, worker=None):
+    """
+    Выполняет все наступившие задачи: при ``concurrency`` больше
+    единицы — в пуле процессов. Возвращает пару (выполнено, с ошибкой).
+    """
+    concurrency = concurrency or getattr(settings, 'JOBS_CONCURRENCY', 2)
+    worker = worker or worker_id()
+    done = failed = 0
+
+    def count(status):
+        nonlocal done, failed
+        if status == Job.DONE:
+            done += 1
+        else:
+            failed += 1
+
+    if concurrency <= 1:
+        while True:
+            claimed = claim(worker, 1)
+            if not claimed:
+                return done, failed
+            count(execute(claimed[0], worker))
+
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=concurrency,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+    ) as pool:
+        running = set()
+        while True:
+            free = concurrency - len(running)
+            if free:
+                running |= {
+                    pool.submit(execute, pk, worker)
+                    for pk in claim(worker, free)
+                }
+            if not running:
+                return done, failed
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                # Задача упавшего процесса вернётся в очередь по таймауту.
+                count(Job.FAILED if future.exception() else future.result())
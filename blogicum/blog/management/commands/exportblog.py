@@ -0,0 +1,135 @@
+import csv
+import gzip
+import io
+from datetime import datetime, time
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Comment, Post
+
+# Поля values() и поле даты для --since: у публикаций — дата изменения,
+# у комментариев её нет, поэтому берётся дата создания.
+EXPORTS = {
+    'posts': (Post, 'updated_at', (
+        'id', 'title', 'text', 'pub_date', 'is_published', 'created_at',
+        'updated_at', 'image', 'comment_count',
+        'author_id', 'author__username',
+        'category_id', 'category__slug', 'category__title',
+        'location_id', 'location__name',
+    )),
+    'comments': (Comment, 'create_at', (
+        'id', 'post_id', 'author_id', 'author__username', 'text',
+        'create_at',
+    )),
+}
+FORMATS = ('jsonl', 'csv')
+
+
+def parse_since(value):
+    """Момент времени из ISO-строки: даты или даты со временем."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Не удалось разобрать дату: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(kind, since=None, chunk_size=2000):
+    """
+    Строки выгрузки словарями values(): без экземпляров моделей
+    и с чтением из базы по ``chunk_size`` строк.
+    """
+    model, changed_field, fields = EXPORTS[kind]
+    queryset = model._base_manager.order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(**{f'{changed_field}__gte': since})
+    return queryset.values(*fields).iterator(chunk_size=chunk_size)
+
+
+def write_jsonl(rows, fields, fh):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    count = 0
+    for row in rows:
+        fh.write(encoder.encode(row) + '\n')
+        count += 1
+    return count
+
+
+def write_csv(rows, fields, fh):
+    writer = csv.DictWriter(fh, fieldnames=fields)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+WRITERS = {'jsonl': write_jsonl, 'csv': write_csv}
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации или комментарии в JSON Lines или CSV'
+        ' потоком, не загружая таблицу в память целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '-o', '--output', default='-',
+            help='Файл выгрузки; «-» — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат выгрузки; по умолчанию по расширению файла.',
+        )
+        parser.add_argument(
+            '--since',
+            help=(
+                'Выгружать только записи с этого момента: публикации,'
+                ' изменённые с него, и комментарии, созданные с него'
+                ' (правки комментариев не учитываются).'
+            ),
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать выгрузку gzip на лету.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из базы за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        compress = options['gzip'] or output.endswith('.gz')
+        if compress and output == '-':
+            raise CommandError('Сжатая выгрузка пишется только в файл.')
+        fmt = options['format'] or (
+            'csv' if output.endswith(('.csv', '.csv.gz')) else 'jsonl'
+        )
+        since = parse_since(options['since']) if options['since'] else None
+        kind = options['kind']
+        rows = export_rows(kind, since, options['chunk_size'])
+        write = partial(WRITERS[fmt], rows, EXPORTS[kind][2])
+        if output == '-':
+            write(self.stdout)
+            return
+        with open(output, 'wb') as raw:
+            binary = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+            with io.TextIOWrapper(
+                binary, encoding='utf-8', newline=''
+            ) as fh:
+                count = write(fh)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено записей: {count} в {output}'
+        ))
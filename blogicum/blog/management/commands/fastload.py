@@ -0,0 +1,251 @@
+import json
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connections, transaction,
+)
+from django.utils import timezone
+
+from blog.cache import feed_tag, invalidate_tags
+from blog.comment_counts import recount_comments
+from blog.models import Post
+from blog.search import rebuild
+from blog.visibility import forget_next_visibility_change
+
+READ_SIZE = 64 * 1024
+DERIVED_DATA_MODELS = {'blog.post', 'blog.comment'}
+
+
+def _skip_separators(buffer, position):
+    while position < len(buffer) and (
+        buffer[position].isspace() or buffer[position] == ','
+    ):
+        position += 1
+    return position
+
+
+def iter_json_array(fh, read_size=READ_SIZE):
+    """
+    Отдаёт элементы JSON-массива из файла по одному, держа в памяти
+    только текущий элемент и недочитанный хвост.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = eof = False
+    while True:
+        position = _skip_separators(buffer, position)
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('Ожидался JSON-массив объектов.')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                continue
+        if eof:
+            raise ValueError('JSON-массив оборвался.')
+        chunk = fh.read(read_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def fill_timestamps(model, objects):
+    """Проставляет текущее время в пустые поля auto_now и auto_now_add."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    now = timezone.now()
+    for obj in objects:
+        for field in fields:
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, now)
+
+
+def model_order():
+    """Номер каждой модели в порядке зависимостей по внешним ключам."""
+    ordered = serializers.sort_dependencies(
+        [(config, None) for config in apps.get_app_configs()],
+        allow_cycles=True,
+    )
+    return {model: index for index, model in enumerate(ordered)}
+
+
+class Loader:
+    """Копит объекты по моделям и вставляет их пачками."""
+
+    def __init__(self, using, batch_size, ignorenonexistent):
+        self.using = using
+        self.batch_size = batch_size
+        self.ignorenonexistent = ignorenonexistent
+        self.order = model_order()
+        self.pending = defaultdict(list)
+        self.buffered = 0
+        self.loaded = defaultdict(int)
+
+    def add(self, record):
+        for deserialized in serializers.deserialize(
+            'python', [record], using=self.using,
+            ignorenonexistent=self.ignorenonexistent,
+        ):
+            self.pending[type(deserialized.object)].append(deserialized)
+            self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model in sorted(self.pending, key=self.order.get):
+            self._insert(model, self.pending[model])
+        self.pending.clear()
+        self.buffered = 0
+
+    def _insert(self, model, batch):
+        objects = [deserialized.object for deserialized in batch]
+        fill_timestamps(model, objects)
+        manager = model._base_manager.using(self.using)
+        existing = set(manager.filter(
+            pk__in=[obj.pk for obj in objects]
+        ).values_list('pk', flat=True))
+        new = [obj for obj in objects if obj.pk not in existing]
+        old = [obj for obj in objects if obj.pk in existing]
+        fields = model._meta.local_concrete_fields
+        step = min(
+            connections[self.using].ops.bulk_batch_size(fields, new),
+            self.batch_size,
+        )
+        for start in range(0, len(new), step):
+            # Как save(raw=True) в loaddata: значения из фикстуры
+            # пишутся как есть, auto_now их не перезаписывает.
+            manager._insert(
+                new[start:start + step],
+                fields=fields, raw=True, using=self.using,
+            )
+        if old:
+            manager.bulk_update(
+                old, [field.name for field in fields if not field.primary_key],
+                batch_size=self.batch_size,
+            )
+        self._set_m2m(model, batch)
+        self.loaded[model._meta.label_lower] += len(objects)
+
+    def _set_m2m(self, model, batch):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            rows = [
+                (deserialized.object.pk, value)
+                for deserialized in batch
+                for value in deserialized.m2m_data.get(field.name, ())
+            ]
+            through._base_manager.using(self.using).filter(**{
+                f'{source}__in': [d.object.pk for d in batch]
+            }).delete()
+            through._base_manager.using(self.using).bulk_create(
+                [through(**{source: pk, target: value})
+                 for pk, value in rows],
+                batch_size=self.batch_size,
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает JSON-фикстуры: объекты читаются потоком'
+        ' и вставляются пачками INSERT без save() и сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixtures', nargs='+', help='Пути к JSON-файлам.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько объектов вставлять за один раз.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которую загружать объекты.',
+        )
+        parser.add_argument(
+            '-i', '--ignorenonexistent', action='store_true',
+            help='Пропускать поля, которых нет в моделях.',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        loader = Loader(
+            using, options['batch_size'], options['ignorenonexistent']
+        )
+        connection = connections[using]
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(using=using):
+                # Как loaddata: ссылки проверяются после загрузки всех
+                # файлов, поэтому порядок объектов в них не важен.
+                with connection.constraint_checks_disabled():
+                    for path in options['fixtures']:
+                        with open(path, encoding='utf-8') as fh:
+                            for record in iter_json_array(fh):
+                                loader.add(record)
+                    loader.flush()
+                models = [
+                    apps.get_model(label) for label in loader.loaded
+                ]
+                connection.check_constraints(
+                    table_names=[model._meta.db_table for model in models]
+                )
+                self._reset_sequences(connection, models)
+        except (
+            OSError, ValueError, DeserializationError, IntegrityError
+        ) as error:
+            raise CommandError(f'Не удалось загрузить фикстуры: {error}')
+        elapsed = time.perf_counter() - started
+        total = sum(loader.loaded.values())
+        if DERIVED_DATA_MODELS & set(loader.loaded):
+            self._refresh_derived_data(using)
+        for label, count in sorted(loader.loaded.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.2f} с'
+            f' ({total / elapsed if elapsed else total:.0f} в секунду)'
+        ))
+
+    def _refresh_derived_data(self, using):
+        """
+        bulk_create не вызывает save() и сигналы: пересчитывает то,
+        что они поддерживают для публикаций и комментариев.
+        """
+        now = timezone.now()
+        posts = Post.objects.using(using)
+        posts.filter(pub_date__gt=now).update(is_scheduled=True)
+        posts.filter(pub_date__lte=now).update(is_scheduled=False)
+        recount_comments(posts.all())
+        rebuild(using=using)
+        forget_next_visibility_change()
+        invalidate_tags(feed_tag())
+
+    def _reset_sequences(self, connection, models):
+        statements = connection.ops.sequence_reset_sql(
+            self.style, models
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
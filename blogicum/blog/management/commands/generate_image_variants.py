@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from blog.cache import category_tag, feed_tag, invalidate_tags, post_tag
+from blog.images import generate_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и у публикаций, где они уже есть.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').select_related(
+            'category'
+        ).only('id', 'image', 'image_variants_source', 'category__slug')
+        if not options['all']:
+            posts = posts.exclude(image_variants_source=F('image'))
+        done = failed = 0
+        for post in posts.iterator():
+            ready = generate_variants(post.image)
+            Post.objects.filter(pk=post.pk).update(
+                image_variants_source=post.image.name if ready else '',
+                updated_at=timezone.now(),
+            )
+            invalidate_tags(
+                feed_tag(),
+                post_tag(post.pk),
+                *([category_tag(post.category.slug)] if post.category else []),
+            )
+            if ready:
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {done}, недоступно: {failed}'
+        ))
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.profiling import report
+
+
+def _ms(value):
+    return '-' if value is None else f'{1000 * value:.1f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит перцентили времени ответа, числа и времени SQL-запросов'
+        ' по представлениям из снимков ProfilingMiddleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', default=None,
+            help='Каталог снимков (по умолчанию BLOG_PROFILING_DIR).'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести полный отчёт в формате JSON.'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or getattr(
+            settings, 'BLOG_PROFILING_DIR', None
+        )
+        if not directory or not Path(directory).is_dir():
+            raise CommandError('Каталог снимков профилирования не найден.')
+        snapshots = [
+            json.loads(path.read_text(encoding='utf-8'))
+            for path in sorted(Path(directory).glob('*.json'))
+        ]
+        result = report(snapshots)
+        if options['json']:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(
+            f'{"view":<28}{"n":>6}{"p50 ms":>9}{"p90 ms":>9}{"p99 ms":>9}'
+            f'{"sql p90":>9}{"db p90 ms":>11}'
+        )
+        for name, stats in sorted(result.items()):
+            duration = stats['duration']
+            self.stdout.write(
+                f'{name:<28}{duration["count"]:>6}'
+                f'{_ms(duration["p50"]):>9}{_ms(duration["p90"]):>9}'
+                f'{_ms(duration["p99"]):>9}'
+                f'{stats["queries"]["p90"]:>9}'
+                f'{_ms(stats["db_time"]["p90"]):>11}'
+            )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.visibility import announce_visible_posts, next_visibility_change
+
+
+class Command(BaseCommand):
+    help = (
+        'Объявляет отложенные публикации, дата которых наступила,'
+        ' сигналом post_became_visible.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующей отложенной публикации.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Наибольшая пауза между проверками, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            visible = announce_visible_posts()
+            if visible:
+                self.stdout.write(
+                    f'Опубликовано отложенных публикаций: {len(visible)}'
+                )
+            if not options['loop']:
+                break
+            change = next_visibility_change()
+            pause = options['interval']
+            if change is not None:
+                pause = min(
+                    pause, (change - timezone.now()).total_seconds()
+                )
+            time.sleep(max(pause, 0.1))
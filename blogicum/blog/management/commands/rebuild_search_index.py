@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_backend, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций индексировать за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {indexed}'
+            f' (индекс {get_backend().name})'
+        ))
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'JOBS_CONCURRENCY', 2),
+            help='Сколько задач выполнять одновременно (процессов).'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а опрашивать очередь постоянно.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done, failed = run_pending(options['concurrency'])
+            if done or failed:
+                self.stdout.write(
+                    f'Выполнено: {done}, с ошибкой: {failed}'
+                )
+            if not options['loop']:
+                break
+            if not done and not failed:
+                time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а опрашивать очередь постоянно.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, с ошибкой: {failed}'
+                )
+            if not options['loop']:
+                break
+            if not sent and not failed:
+                time.sleep(options['interval'])
@@ -0,0 +1,307 @@
+"""
+Метрики в текстовом формате Prometheus без внешних зависимостей.
+
+``MetricsMiddleware`` считает запросы и SQL-запросы, строит гистограммы
+задержек и ведёт число обрабатываемых запросов с меткой имени маршрута
+(``blog:index``, ``blog:post_detail`` и т. д.). Под pre-fork WSGI-сервером
+каждый процесс сохраняет свои значения в ``BLOG_METRICS_DIR``, а
+``/metrics`` суммирует файлы всех процессов; gauge-метрики учитываются
+только для живых процессов. У потоковых ответов длительность измеряется
+до начала отправки, а SQL-запросы считаются и во время отправки.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+from .streaming import iterate_within
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+UNRESOLVED = '<unresolved>'
+
+HELP = {
+    'http_requests_total': 'Обработанные HTTP-запросы.',
+    'http_request_duration_seconds': 'Время обработки HTTP-запроса.',
+    'http_requests_in_flight': 'HTTP-запросы в обработке.',
+    'db_queries_total': 'SQL-запросы, выполненные при обработке запросов.',
+    'db_connections_opened_total': 'Открытые соединения с базой.',
+    'db_connections_reused_total': 'Соединения, взятые следующим запросом.',
+    'db_connections_closed_total': 'Закрытые соединения с базой.',
+    'db_connections_dead_total': 'Соединения, не прошедшие проверку.',
+    'db_connections_open': 'Открытые сейчас соединения с базой.',
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsStore:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.counters = defaultdict(float)
+        self.gauges = defaultdict(float)
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[(name, _labels_key(labels))] += value
+
+    def add_gauge(self, name, labels, value):
+        with self.lock:
+            self.gauges[(name, _labels_key(labels))] += value
+
+    def observe(self, name, labels, value):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            histogram = self.histograms.setdefault(key, {
+                'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0,
+            })
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def dump(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'buckets': list(self.buckets),
+                'counters': [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'gauges': [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.gauges.items()
+                ],
+                'histograms': [
+                    [name, list(labels), histogram]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def flush(self, force=False):
+        directory = getattr(settings, 'BLOG_METRICS_DIR', None)
+        interval = getattr(settings, 'BLOG_METRICS_FLUSH_INTERVAL', 1)
+        now = time.monotonic()
+        if not directory or (not force and now - self.last_flush < interval):
+            return
+        self.last_flush = now
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f'metrics_{os.getpid()}.json'
+        tmp = target.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.dump()), encoding='utf-8')
+        os.replace(tmp, target)
+
+
+store = MetricsStore()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """Снимки всех процессов: из каталога метрик или текущего процесса."""
+    directory = getattr(settings, 'BLOG_METRICS_DIR', None)
+    if not directory:
+        return [store.dump()]
+    store.flush(force=True)
+    dumps = []
+    for path in Path(directory).glob('metrics_*.json'):
+        try:
+            dumps.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return dumps
+
+
+def _format_labels(labels, extra=()):
+    pairs = [tuple(pair) for pair in labels] + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for key, value in pairs
+    )
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def merge(dumps):
+    """Суммирует снимки процессов; gauge-метрики — только живых."""
+    counters = defaultdict(float)
+    gauges = defaultdict(float)
+    histograms = {}
+    for dump in dumps:
+        for name, labels, value in dump['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        if _process_alive(dump['pid']):
+            for name, labels, value in dump['gauges']:
+                gauges[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, histogram in dump['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, {
+                'bounds': dump['buckets'],
+                'buckets': [0] * len(dump['buckets']),
+                'sum': 0.0, 'count': 0,
+            })
+            for index, count in enumerate(histogram['buckets']):
+                merged['buckets'][index] += count
+            merged['sum'] += histogram['sum']
+            merged['count'] += histogram['count']
+    return counters, gauges, histograms
+
+
+def render(dumps):
+    counters, gauges, histograms = merge(dumps)
+    lines = []
+    for kind, values in (('counter', counters), ('gauge', gauges)):
+        for name in sorted({name for name, _ in values}):
+            lines.append(f'# HELP {name} {HELP.get(name, name)}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(
+                        f'{name}{_format_labels(labels)} '
+                        f'{_format_value(value)}'
+                    )
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f'# HELP {name} {HELP.get(name, name)}')
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(histogram['bounds'], histogram['buckets']):
+                lines.append(
+                    f'{name}_bucket'
+                    f'{_format_labels(labels, [("le", bound)])} {count}'
+                )
+            lines.append(
+                f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])}'
+                f' {histogram["count"]}'
+            )
+            lines.append(
+                f'{name}_sum{_format_labels(labels)} '
+                f'{_format_value(histogram["sum"])}'
+            )
+            lines.append(
+                f'{name}_count{_format_labels(labels)} {histogram["count"]}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def wrap_all_connections(wrapper):
+    """Подключает ``execute_wrapper`` ко всем соединениям с базами."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'BLOG_METRICS', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if getattr(settings, 'BLOG_METRICS_DIR', None):
+            atexit.register(store.flush, force=True)
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        counter = QueryCounter()
+        try:
+            with wrap_all_connections(counter):
+                response = self.get_response(request)
+        finally:
+            route = getattr(request, '_metrics_route', None)
+            if route is not None:
+                store.add_gauge(
+                    'http_requests_in_flight', {'route': route}, -1
+                )
+        route = route or UNRESOLVED
+        labels = {'route': route, 'method': request.method}
+        store.observe(
+            'http_request_duration_seconds',
+            labels,
+            time.perf_counter() - started,
+        )
+        store.inc(
+            'http_requests_total',
+            dict(labels, status=str(response.status_code)),
+        )
+        count_queries = partial(self.count_queries, route, counter)
+        if response.streaming:
+            response.streaming_content = iterate_within(
+                response.streaming_content,
+                partial(wrap_all_connections, counter),
+                count_queries,
+            )
+        else:
+            count_queries()
+        return response
+
+    def count_queries(self, route, counter):
+        store.inc('db_queries_total', {'route': route}, counter.count)
+        store.flush()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_route = request.resolver_match.view_name
+        store.add_gauge(
+            'http_requests_in_flight', {'route': request._metrics_route}, 1
+        )
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
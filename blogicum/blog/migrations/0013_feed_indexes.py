@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'create_at'], name='comment_post_create_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['pub_date', 'category'], name='post_published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'pub_date'], name='post_author_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dedupe_key', models.CharField(max_length=255, unique=True, verbose_name='Ключ дедупликации')),
+                ('subject', models.CharField(max_length=256, verbose_name='Тема')),
+                ('body', models.TextField(verbose_name='Текст')),
+                ('from_email', models.CharField(max_length=256, verbose_name='Отправитель')),
+                ('recipients', models.TextField(help_text='Адреса через запятую.', verbose_name='Получатели')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает отправки'), ('sent', 'Отправлено'), ('failed', 'Ошибка отправки')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+            ],
+            options={
+                'verbose_name': 'исходящее письмо',
+                'verbose_name_plural': 'Исходящие письма',
+                'ordering': ('next_attempt_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='outgoing_email_due_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+    ]
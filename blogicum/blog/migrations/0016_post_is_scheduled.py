@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:58
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_scheduled_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(pub_date__gt=timezone.now()).update(is_scheduled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_scheduled',
+            field=models.BooleanField(default=False, editable=False, help_text='Дата публикации ещё не наступила и о её наступлении не объявлено.', verbose_name='Отложенная публикация'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_scheduled', True)), fields=['pub_date'], name='post_scheduled_idx'),
+        ),
+        migrations.RunPython(mark_scheduled_posts, migrations.RunPython.noop),
+    ]
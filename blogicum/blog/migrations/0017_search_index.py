@@ -0,0 +1,56 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+            return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # Совпадение в заголовке весит в десять раз больше, чем в тексте.
+    schema_editor.execute(
+        'INSERT INTO blog_post_fts (blog_post_fts, rank)'
+        " VALUES ('rank', 'bm25(10.0, 1.0)')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_is_scheduled'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Термин')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'термин поиска',
+                'verbose_name_plural': 'Термины поиска',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='search_term_post_unique'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
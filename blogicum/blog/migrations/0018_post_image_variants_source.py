@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants_source',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Фото, для которого созданы копии'),
+        ),
+    ]
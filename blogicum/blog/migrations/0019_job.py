@@ -0,0 +1,46 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:18
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_image_variants_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=128, verbose_name='Задача')),
+                ('kwargs', models.JSONField(default=dict, verbose_name='Аргументы')),
+                ('idempotency_key', models.CharField(blank=True, max_length=255, null=True, unique=True, verbose_name='Ключ идемпотентности')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает выполнения'), ('running', 'Выполняется'), ('done', 'Выполнено'), ('failed', 'Ошибка выполнения')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток выполнения')),
+                ('max_attempts', models.PositiveSmallIntegerField(verbose_name='Максимум попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка')),
+                ('locked_by', models.CharField(blank=True, max_length=64, verbose_name='Обработчик')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взято в работу')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Результат')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ('next_attempt_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='job_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['locked_at'], name='job_running_idx'),
+        ),
+    ]
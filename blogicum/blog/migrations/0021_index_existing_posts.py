@@ -0,0 +1,34 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def index_existing_posts(apps, schema_editor):
+    # Индекс из 0017 создаётся пустым, а сигналы сохранения срабатывают
+    # только для новых правок: уже существующие публикации индексируются
+    # здесь.
+    from blog.search import get_backend
+
+    alias = schema_editor.connection.alias
+    backend = get_backend(alias)
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(alias).only('id', 'title', 'text')
+    batch = []
+    for post in posts.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            backend.index(batch)
+            batch = []
+    if batch:
+        backend.index(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_post_image_content_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_existing_posts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
+
+from .images import variant_name
+from .storage import ContentAddressedStorage
 
 
 class PublishedDatecreatedBaseModel(models.Model):
@@ -12,6 +16,10 @@ class PublishedDatecreatedBaseModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -49,10 +57,35 @@ class Location(PublishedDatecreatedBaseModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    @staticmethod
+    def published_condition():
+        """Условие видимости публикации для всех читателей."""
+        return models.Q(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+
+    def published(self):
+        return self.filter(self.published_condition())
+
+    def visible_to(self, user):
+        """Опубликованные посты, а для автора — и все его собственные."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(
+            self.published_condition() | models.Q(author=user)
+        )
+
+
 class Post(PublishedDatecreatedBaseModel):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото', upload_to='post_images', blank=True, db_index=True,
+        storage=ContentAddressedStorage(),
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text='Если установить дату и время в будущем'
@@ -73,11 +106,53 @@ class Post(PublishedDatecreatedBaseModel):
                                  null=True,
                                  related_name='posts',
                                  verbose_name='Категория')
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    is_scheduled = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Отложенная публикация',
+        help_text='Дата публикации ещё не наступила'
+                  ' и о её наступлении не объявлено.'
+    )
+
+    image_variants_source = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name='Фото, для которого созданы копии'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'category'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_scheduled=True),
+                name='post_scheduled_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pub_date is not None:
+            self.is_scheduled = self.pub_date > timezone.now()
+        super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("blog:post_detail", kwargs={"post_id": self.pk})
@@ -85,6 +160,33 @@ class Post(PublishedDatecreatedBaseModel):
     def __str__(self):
         return self.title
 
+    @property
+    def has_image_variants(self):
+        return bool(self.image) and (
+            self.image_variants_source == self.image.name
+        )
+
+    def _image_variant_url(self, variant, extension):
+        return self.image.storage.url(
+            variant_name(self.image.name, variant, extension)
+        )
+
+    @property
+    def image_thumb_url(self):
+        return self._image_variant_url('thumb', 'jpg')
+
+    @property
+    def image_thumb_webp_url(self):
+        return self._image_variant_url('thumb', 'webp')
+
+    @property
+    def image_medium_url(self):
+        return self._image_variant_url('medium', 'jpg')
+
+    @property
+    def image_medium_webp_url(self):
+        return self._image_variant_url('medium', 'webp')
+
 
 class Comment(models.Model):
     text = models.TextField('Комментарий')
@@ -98,3 +200,173 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('create_at',)
+        indexes = [
+            models.Index(
+                fields=['post', 'create_at'],
+                name='comment_post_create_at_idx',
+            ),
+        ]
+
+
+class SearchTerm(models.Model):
+    term = models.CharField('Термин', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    weight = models.PositiveIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'термин поиска'
+        verbose_name_plural = 'Термины поиска'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'],
+                name='search_term_post_unique',
+            ),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка отправки'),
+    )
+
+    dedupe_key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Ключ дедупликации'
+    )
+    subject = models.CharField(max_length=256, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=256, verbose_name='Отправитель')
+    recipients = models.TextField(
+        verbose_name='Получатели',
+        help_text='Адреса через запятую.'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at', 'id')
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='pending'),
+                name='outgoing_email_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.subject
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает выполнения'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнено'),
+        (FAILED, 'Ошибка выполнения'),
+    )
+
+    task = models.CharField(max_length=128, verbose_name='Задача')
+    kwargs = models.JSONField(default=dict, verbose_name='Аргументы')
+    idempotency_key = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='Ключ идемпотентности'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток выполнения'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    locked_by = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взято в работу'
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name='Результат')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершено'
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('next_attempt_at', 'id')
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='pending'),
+                name='job_due_idx',
+            ),
+            models.Index(
+                fields=['locked_at'],
+                condition=models.Q(status='running'),
+                name='job_running_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
@@ -0,0 +1,114 @@
+import datetime as dt
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(dedupe_key, subject, body, recipient_list, from_email=None):
+    """
+    Ставит письмо в очередь на отправку.
+
+    Повторная постановка с тем же ``dedupe_key`` ничего не меняет,
+    поэтому одно событие порождает ровно одно письмо.
+    """
+    return OutgoingEmail.objects.get_or_create(
+        dedupe_key=dedupe_key,
+        defaults={
+            'subject': subject,
+            'body': body,
+            'from_email': from_email or settings.DEFAULT_FROM_EMAIL,
+            'recipients': ','.join(recipient_list),
+        },
+    )
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'OUTBOX_RETRY_DELAY', 60)
+    return dt.timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def claim_email(email):
+    """
+    Забирает письмо на отправку, сдвигая срок следующей попытки:
+    если письмо уже забрал другой обработчик, возвращает False.
+    """
+    now = timezone.now()
+    lease = dt.timedelta(
+        seconds=getattr(settings, 'OUTBOX_CLAIM_TIMEOUT', 300)
+    )
+    return OutgoingEmail.objects.filter(
+        pk=email.pk,
+        status=OutgoingEmail.PENDING,
+        next_attempt_at__lte=now,
+    ).update(next_attempt_at=now + lease) == 1
+
+
+def deliver_pending(batch_size=100, connection=None):
+    """
+    Отправляет пачку писем, срок отправки которых наступил,
+    через одно соединение с почтовым бэкендом.
+
+    Возвращает пару (отправлено, не отправлено).
+    """
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    batch = [
+        email for email in OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING,
+            next_attempt_at__lte=timezone.now(),
+        )[:batch_size]
+        if claim_email(email)
+    ]
+    if not batch:
+        return 0, 0
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        try:
+            connection.open()
+        except Exception as error:
+            # Без соединения попытка не удалась у всех взятых писем.
+            for email in batch:
+                _record_failure(email, error, max_attempts)
+            return 0, len(batch)
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients.split(','),
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failed += 1
+                _record_failure(email, error, max_attempts)
+            else:
+                sent += 1
+                email.attempts += 1
+                email.status = OutgoingEmail.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                _save_attempt(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def _save_attempt(email):
+    email.save(update_fields=(
+        'attempts', 'status', 'sent_at', 'next_attempt_at', 'last_error',
+    ))
+
+
+def _record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= max_attempts:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    _save_attempt(email)
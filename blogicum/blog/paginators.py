@@ -0,0 +1,144 @@
+import base64
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPaginator:
+    """
+    Постраничный вывод по курсору (keyset pagination).
+
+    Вместо COUNT(*) и OFFSET страница выбирается условием по ключу
+    сортировки последней (или первой) записи предыдущей страницы.
+    Все поля ключа должны сортироваться в одном направлении,
+    а последнее поле — быть уникальным.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(key.lstrip('-') for key in self.ordering)
+        if any(
+            key.startswith('-') != self.descending for key in self.ordering
+        ):
+            raise ValueError(
+                'Все поля курсора должны сортироваться в одном направлении.'
+            )
+
+    def encode_cursor(self, obj):
+        values = []
+        for name in self.fields:
+            field = obj._meta.get_field(name)
+            values.append(field.value_to_string(obj))
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            values = json.loads(raw)
+        except (TypeError, ValueError) as error:
+            raise InvalidCursor('Некорректный курсор.') from error
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor('Некорректный курсор.')
+        opts = self.object_list.model._meta
+        try:
+            values = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except Exception as error:
+            raise InvalidCursor('Некорректный курсор.') from error
+        # Поля ключа не бывают пустыми: по None не построить условие.
+        if any(value is None or value == '' for value in values):
+            raise InvalidCursor('Некорректный курсор.')
+        return values
+
+    def _seek(self, values, forward):
+        """Условие «строго после/до» кортежа значений ключа."""
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_name, prev_value in zip(
+                self.fields[:index], values[:index]
+            ):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def page(self, after=None, before=None):
+        queryset = self.object_list
+        if before is not None:
+            reversed_ordering = [
+                key[1:] if key.startswith('-') else f'-{key}'
+                for key in self.ordering
+            ]
+            queryset = queryset.filter(
+                self._seek(self.decode_cursor(before), forward=False)
+            ).order_by(*reversed_ordering)
+        else:
+            if after is not None:
+                queryset = queryset.filter(
+                    self._seek(self.decode_cursor(after), forward=True)
+                )
+            queryset = queryset.order_by(*self.ordering)
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if before is not None:
+            items.reverse()
+            return CursorPage(
+                items, self, has_next=True, has_previous=has_more
+            )
+        return CursorPage(
+            items, self, has_next=has_more, has_previous=after is not None
+        )
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
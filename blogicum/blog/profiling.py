@@ -0,0 +1,280 @@
+"""
+Профилирование запросов без debug toolbar.
+
+``ProfilingMiddleware`` включается настройкой ``BLOG_PROFILING`` и для
+каждого запроса собирает число и время SQL-запросов, самые медленные
+запросы по нормализованным отпечаткам, время отрисовки шаблонов и
+попадания в кэш. Данные агрегируются в памяти процесса по имени
+представления; при заданной ``BLOG_PROFILING_DIR`` снимок периодически
+сохраняется в файл процесса, откуда его читает команда
+``profiling_report``. Потоковый ответ профилируется до конца отправки.
+"""
+import contextvars
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.template.base import Template
+
+from .metrics import wrap_all_connections
+from .streaming import iterate_within
+
+SAMPLE_SIZE = 1000
+SLOWEST_SIZE = 10
+
+_current = contextvars.ContextVar('blog_profiling_request', default=None)
+
+
+def fingerprint(sql):
+    """Нормализованный текст запроса без значений параметров."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    sql = re.sub(r'%s', '?', sql)
+    sql = re.sub(r'\(\s*\?(\s*,\s*\?)*\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        'count': len(values),
+        'p50': percentile(values, 0.5),
+        'p90': percentile(values, 0.9),
+        'p99': percentile(values, 0.99),
+        'max': max(values) if values else None,
+    }
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = []
+        self.templates = defaultdict(float)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+
+def record_cache_access(hit):
+    """Отмечает обращение к кэшу в профиле текущего запроса."""
+    profile = _current.get()
+    if profile is None:
+        return
+    if hit:
+        profile.cache_hits += 1
+    else:
+        profile.cache_misses += 1
+
+
+class ViewStats:
+    def __init__(self):
+        self.durations = deque(maxlen=SAMPLE_SIZE)
+        self.query_counts = deque(maxlen=SAMPLE_SIZE)
+        self.db_times = deque(maxlen=SAMPLE_SIZE)
+        self.statements = {}
+        self.templates = defaultdict(lambda: [0, 0.0])
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, duration, profile):
+        self.durations.append(duration)
+        self.query_counts.append(len(profile.queries))
+        self.db_times.append(sum(t for _, t in profile.queries))
+        for sql, elapsed in profile.queries:
+            key = fingerprint(sql)
+            stats = self.statements.setdefault(
+                key, {'count': 0, 'total': 0.0, 'max': 0.0}
+            )
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+        for name, elapsed in profile.templates.items():
+            self.templates[name][0] += 1
+            self.templates[name][1] += elapsed
+        self.cache_hits += profile.cache_hits
+        self.cache_misses += profile.cache_misses
+
+    def as_dict(self):
+        slowest = sorted(
+            self.statements.items(),
+            key=lambda item: item[1]['max'],
+            reverse=True,
+        )[:SLOWEST_SIZE]
+        return {
+            'durations': list(self.durations),
+            'query_counts': list(self.query_counts),
+            'db_times': list(self.db_times),
+            'slowest_statements': [
+                dict(stats, fingerprint=key) for key, stats in slowest
+            ],
+            'templates': {
+                name: {'count': count, 'total': total}
+                for name, (count, total) in self.templates.items()
+            },
+            'cache': {'hits': self.cache_hits, 'misses': self.cache_misses},
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(ViewStats)
+        self.last_flush = time.monotonic()
+
+    def add(self, view_name, duration, profile):
+        with self.lock:
+            self.views[view_name].add(duration, profile)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: stats.as_dict() for name, stats in self.views.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+    def flush(self, force=False):
+        directory = getattr(settings, 'BLOG_PROFILING_DIR', None)
+        interval = getattr(settings, 'BLOG_PROFILING_FLUSH_INTERVAL', 10)
+        now = time.monotonic()
+        if not directory or (not force and now - self.last_flush < interval):
+            return
+        self.last_flush = now
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f'{os.getpid()}.json'
+        tmp = target.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+        os.replace(tmp, target)
+
+
+registry = Registry()
+
+
+def report(snapshots):
+    """Сводка с перцентилями по одному или нескольким снимкам."""
+    merged = defaultdict(lambda: {
+        'durations': [], 'query_counts': [], 'db_times': [],
+        'slowest_statements': [], 'templates': defaultdict(
+            lambda: {'count': 0, 'total': 0.0}
+        ),
+        'cache': {'hits': 0, 'misses': 0},
+    })
+    for snapshot in snapshots:
+        for name, stats in snapshot.items():
+            target = merged[name]
+            for key in ('durations', 'query_counts', 'db_times'):
+                target[key].extend(stats[key])
+            target['slowest_statements'].extend(stats['slowest_statements'])
+            for template, values in stats['templates'].items():
+                target['templates'][template]['count'] += values['count']
+                target['templates'][template]['total'] += values['total']
+            for key in ('hits', 'misses'):
+                target['cache'][key] += stats['cache'][key]
+    return {
+        name: {
+            'duration': summarize(stats['durations']),
+            'queries': summarize(stats['query_counts']),
+            'db_time': summarize(stats['db_times']),
+            'slowest_statements': sorted(
+                stats['slowest_statements'],
+                key=lambda item: item['max'],
+                reverse=True,
+            )[:SLOWEST_SIZE],
+            'templates': dict(stats['templates']),
+            'cache': stats['cache'],
+        }
+        for name, stats in merged.items()
+    }
+
+
+_original_render = Template.render
+
+
+def _profiled_render(self, context):
+    profile = _current.get()
+    if profile is None:
+        return _original_render(self, context)
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        profile.templates[self.name or '<string>'] += (
+            time.perf_counter() - started
+        )
+
+
+@contextmanager
+def profiling(profile):
+    """Записывает SQL-запросы и шаблоны текущего потока в ``profile``."""
+    token = _current.set(profile)
+    try:
+        with wrap_all_connections(profile):
+            yield
+    finally:
+        _current.reset(token)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'BLOG_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        Template.render = _profiled_render
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        started = time.perf_counter()
+        with profiling(profile):
+            response = self.get_response(request)
+
+        def finish():
+            match = request.resolver_match
+            if match is not None:
+                registry.add(
+                    match.view_name, time.perf_counter() - started, profile
+                )
+                registry.flush()
+
+        if response.streaming:
+            response.streaming_content = iterate_within(
+                response.streaming_content,
+                partial(profiling, profile),
+                finish,
+            )
+        else:
+            finish()
+        return response
+
+
+@staff_member_required
+def profiling_report(request):
+    return JsonResponse(
+        report([registry.snapshot()]),
+        json_dumps_params={'ensure_ascii': False},
+    )
@@ -0,0 +1,154 @@
+"""
+Чтение публичных страниц с реплик базы данных.
+
+Реплики перечисляются в ``BLOG_READ_REPLICAS`` (псевдонимы из
+``DATABASES``). Запросы на чтение уходят на реплики только внутри
+``read_from_replicas()`` — его открывают публичные списки и страницы
+публикаций; всё остальное и любая запись идут в ``default``. Реплика
+выбирается по кругу один раз на ``read_from_replicas()``, чтобы страница
+читала данные одного снимка. Реплика,
+не ответившая на проверку, пропускается ``BLOG_REPLICA_HEALTH_INTERVAL``
+секунд. Кто только что записал данные, ещё ``BLOG_REPLICA_PIN_SECONDS``
+секунд читает из основной базы (cookie ``ReplicaPinMiddleware``),
+чтобы увидеть свою запись до того, как она дойдёт до реплик. Записью
+считается выполненный в основной базе INSERT, UPDATE или DELETE, а не
+вызов ``db_for_write``: его делают и запросы, которые только читают.
+"""
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+PIN_COOKIE = 'blog_primary_until'
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_read_scope = ContextVar('blog_read_scope', default=None)
+_pinned = ContextVar('blog_replica_pinned', default=False)
+_wrote = ContextVar('blog_replica_wrote', default=False)
+_health = {}
+_turn = itertools.count()
+
+
+def replica_aliases():
+    return list(getattr(settings, 'BLOG_READ_REPLICAS', []))
+
+
+@contextmanager
+def read_from_replicas(scope=None):
+    """
+    Направляет чтение на реплики. Словарь ``scope`` из прошлого вызова
+    продолжает чтение с той же реплики.
+    """
+    scope = {} if scope is None else scope
+    token = _read_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _read_scope.reset(token)
+
+
+def stream_from_replicas(chunks, scope=None):
+    """Отдаёт части потокового ответа, читая данные для них с реплик."""
+    chunks = iter(chunks)
+    while True:
+        with read_from_replicas(scope):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def is_healthy(alias):
+    """Проверяет реплику запросом ``SELECT 1`` не чаще раза в интервал."""
+    now = time.monotonic()
+    healthy, checked_at = _health.get(alias, (True, None))
+    interval = getattr(settings, 'BLOG_REPLICA_HEALTH_INTERVAL', 5)
+    if checked_at is not None and now - checked_at < interval:
+        return healthy
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        healthy = True
+    except DatabaseError:
+        connections[alias].close()
+        healthy = False
+    _health[alias] = (healthy, now)
+    return healthy
+
+
+def reset_health():
+    _health.clear()
+
+
+def _detect_writes(execute, sql, params, many, context):
+    if sql.lstrip()[:8].upper().startswith(WRITE_STATEMENTS):
+        _wrote.set(True)
+    return execute(sql, params, many, context)
+
+
+class ReplicaRouter:
+    """Маршрутизатор: чтение в ``read_from_replicas()`` — на реплики."""
+
+    def db_for_read(self, model, **hints):
+        scope = _read_scope.get()
+        if (
+            scope is None
+            or _pinned.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if 'alias' not in scope:
+            healthy = [
+                alias for alias in replica_aliases() if is_healthy(alias)
+            ]
+            scope['alias'] = (
+                healthy[next(_turn) % len(healthy)] if healthy
+                else DEFAULT_DB_ALIAS
+            )
+        return scope['alias']
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+    Ставит cookie после запроса с записью в базу; пока cookie действует,
+    запросы пользователя читают из основной базы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned = float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        pinned_token = _pinned.set(pinned)
+        wrote_token = _wrote.set(False)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(
+                _detect_writes
+            ):
+                response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
+        if wrote and replica_aliases():
+            seconds = getattr(settings, 'BLOG_REPLICA_PIN_SECONDS', 10)
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + seconds),
+                max_age=seconds, httponly=True, samesite='Lax',
+            )
+        return response
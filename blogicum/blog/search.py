@@ -0,0 +1,179 @@
+"""
+Полнотекстовый поиск по заголовкам и текстам публикаций.
+
+На SQLite с FTS5 индекс хранится в виртуальной таблице ``blog_post_fts``
+(её создаёт миграция), иначе — в таблице терминов ``SearchTerm``.
+В обоих случаях текст разбирает ``text_analysis.analyze``, поэтому
+запрос и индекс нормализуются одинаково. Индекс обновляется
+сигналами сохранения и удаления публикации, команда
+``rebuild_search_index`` перестраивает его целиком. Видимость
+результатов определяет переданный в ``search`` queryset.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+from django.db.models.expressions import RawSQL
+
+from .cache import feed_tag, invalidate_tags
+from .models import Post, SearchTerm
+from .text_analysis import analyze
+
+FTS_TABLE = 'blog_post_fts'
+TITLE_WEIGHT = 10
+MAX_QUERY_TERMS = 10
+
+
+_fts5_tables = {}
+
+
+def fts5_table_exists(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts5_tables:
+        _fts5_tables[key] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts5_tables[key]
+
+
+class Fts5Backend:
+    name = 'fts5'
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, posts):
+        rows = [
+            (post.pk, ' '.join(analyze(post.title)),
+             ' '.join(analyze(post.text)))
+            for post in posts
+        ]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk, _, _ in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text)'
+                ' VALUES (%s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, post_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk in post_ids],
+            )
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, queryset, terms):
+        match = ' '.join(f'"{term}"' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,),
+        )).annotate(search_rank=RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+            f' AND rowid = "{table}"."id"',
+            (match,),
+        ))
+
+
+class TermsBackend:
+    name = 'terms'
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @staticmethod
+    def weights(post):
+        weights = Counter(analyze(post.text))
+        for term in analyze(post.title):
+            weights[term] += TITLE_WEIGHT
+        return weights
+
+    def index(self, posts):
+        posts = list(posts)
+        self.remove([post.pk for post in posts])
+        SearchTerm.objects.using(self.connection.alias).bulk_create(
+            (
+                SearchTerm(term=term, post_id=post.pk, weight=weight)
+                for post in posts
+                for term, weight in self.weights(post).items()
+            ),
+            batch_size=1000,
+        )
+
+    def remove(self, post_ids):
+        SearchTerm.objects.using(self.connection.alias).filter(
+            post_id__in=post_ids
+        ).delete()
+
+    def clear(self):
+        SearchTerm.objects.using(self.connection.alias).all().delete()
+
+    def search(self, queryset, terms):
+        return queryset.filter(search_terms__term__in=terms).annotate(
+            matched_terms=Count('search_terms'),
+            search_rank=-Sum('search_terms__weight'),
+        ).filter(matched_terms=len(terms))
+
+
+def get_backend(using=None):
+    connection = connections[using or router.db_for_write(Post)]
+    name = getattr(settings, 'BLOG_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'fts5' if fts5_table_exists(connection) else 'terms'
+    backend = {'fts5': Fts5Backend, 'terms': TermsBackend}[name]
+    return backend(connection)
+
+
+def index_posts(posts):
+    get_backend().index(posts)
+
+
+def remove_posts(post_ids):
+    get_backend().remove(post_ids)
+
+
+def rebuild(batch_size=1000, using=None):
+    """Перестраивает индекс по всем публикациям, возвращает их число."""
+    backend = get_backend(using)
+    indexed = 0
+    with transaction.atomic(using=backend.connection.alias):
+        backend.clear()
+        batch = []
+        posts = Post.objects.using(backend.connection.alias).only(
+            'id', 'title', 'text'
+        ).order_by('id')
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) >= batch_size:
+                backend.index(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            backend.index(batch)
+            indexed += len(batch)
+    invalidate_tags(feed_tag())
+    return indexed
+
+
+def search(queryset, query):
+    """
+    Публикации из ``queryset``, содержащие все слова запроса,
+    от наиболее релевантных к наименее.
+    """
+    terms = list(dict.fromkeys(analyze(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return queryset.none()
+    return get_backend().search(queryset, terms).order_by(
+        'search_rank', '-pub_date', '-id'
+    )
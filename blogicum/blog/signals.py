@@ -0,0 +1,236 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    category_tag,
+    feed_tag,
+    invalidate_tags,
+    post_tag,
+)
+from .images import delete_variants
+from .jobs import enqueue
+from .models import Category, Comment, Location, Post
+from .search import index_posts, remove_posts
+from .visibility import forget_next_visibility_change, post_became_visible
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+@receiver(pre_save, sender=Post)
+def fill_raw_updated_at(sender, instance, raw, **kwargs):
+    # При raw-сохранении (loaddata) auto_now не срабатывает.
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+def _post_ids(**filters):
+    return list(
+        Post.objects.filter(**filters).order_by().values_list('pk', flat=True)
+    )
+
+
+def _post_category_slugs(**filters):
+    return set(
+        Post.objects.filter(**filters)
+        .exclude(category=None)
+        .order_by()
+        .values_list('category__slug', flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_init, sender=Post)
+def remember_post_category(sender, instance, **kwargs):
+    # Через __dict__, чтобы не подгружать отложенное поле.
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_init, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    image = instance.__dict__.get('image')
+    instance._loaded_image = getattr(image, 'name', image) or ''
+
+
+def _delete_unreferenced_image(storage, name, using):
+    if not Post.objects.using(using).filter(image=name).exists():
+        delete_variants(storage, name)
+        storage.delete(name)
+
+
+def _release_image(storage, name, using):
+    """
+    После фиксации транзакции удаляет фото и его копии, если на него
+    не ссылаются публикации: при откате файлы остаются на месте, а
+    ссылки проверяются заново — то же фото могли загрузить ещё раз.
+    """
+    if name:
+        transaction.on_commit(
+            partial(_delete_unreferenced_image, storage, name, using),
+            using=using,
+        )
+
+
+@receiver(post_save, sender=Post)
+def update_image_variants(sender, instance, **kwargs):
+    old_name = getattr(instance, '_loaded_image', '')
+    new_name = instance.image.name or ''
+    instance._loaded_image = new_name
+    if old_name == new_name:
+        return
+    _release_image(instance.image.storage, old_name, instance._state.db)
+    if new_name:
+        enqueue(
+            'blog.image_variants',
+            kwargs={'post_id': instance.pk, 'image_name': new_name},
+            idempotency_key=f'image-variants:{instance.pk}:{new_name}',
+        )
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    _release_image(
+        instance.image.storage, instance.image.name, instance._state.db
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    category_ids = {
+        instance.category_id,
+        getattr(instance, '_loaded_category_id', None),
+    } - {None}
+    if category_ids == {instance.category_id}:
+        slugs = {instance.category.slug}
+    else:
+        slugs = set(
+            Category.objects.filter(pk__in=category_ids)
+            .values_list('slug', flat=True)
+        )
+    instance._loaded_category_id = instance.category_id
+    invalidate_tags(
+        feed_tag(),
+        post_tag(instance.pk),
+        *(category_tag(slug) for slug in slugs),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_next_visibility_change(sender, instance, **kwargs):
+    if instance.is_scheduled or not kwargs.get('created', False):
+        forget_next_visibility_change()
+
+
+@receiver(post_became_visible, sender=Post)
+def invalidate_visible_post_pages(sender, post, **kwargs):
+    invalidate_tags(
+        feed_tag(),
+        post_tag(post.pk),
+        category_tag(post.category.slug),
+    )
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance, **kwargs):
+    instance._cached_slug = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list('slug', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_posts(sender, instance, **kwargs):
+    # После удаления у публикаций уже не будет ссылки на категорию.
+    instance._cached_post_ids = _post_ids(category=instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, '_cached_slug', None)}
+    post_ids = getattr(instance, '_cached_post_ids', None)
+    if post_ids is None:
+        post_ids = _post_ids(category=instance)
+    invalidate_tags(
+        feed_tag(),
+        *(category_tag(slug) for slug in slugs if slug),
+        *(post_tag(post_id) for post_id in post_ids),
+    )
+
+
+@receiver(pre_delete, sender=Location)
+def remember_location_categories(sender, instance, **kwargs):
+    instance._cached_category_slugs = _post_category_slugs(
+        location=instance
+    )
+    instance._cached_post_ids = _post_ids(location=instance)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    slugs = getattr(instance, '_cached_category_slugs', None)
+    if slugs is None:
+        slugs = _post_category_slugs(location=instance)
+    post_ids = getattr(instance, '_cached_post_ids', None)
+    if post_ids is None:
+        post_ids = _post_ids(location=instance)
+    invalidate_tags(
+        feed_tag(),
+        *(category_tag(slug) for slug in slugs),
+        *(post_tag(post_id) for post_id in post_ids),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    invalidate_tags(
+        feed_tag(),
+        post_tag(instance.post_id),
+        *(category_tag(slug) for slug in _post_category_slugs(
+            pk=instance.post_id
+        )),
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_posts([instance.pk])
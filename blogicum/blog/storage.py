@@ -0,0 +1,75 @@
+"""
+Хранилище фото публикаций с адресацией по содержимому.
+
+Файл сохраняется под именем из SHA-256 своего содержимого в
+подкаталогах по первым байтам хэша:
+``post_images/photo.jpg`` → ``post_images/3f/a1/3fa1…e9.jpg``.
+Повторная загрузка того же фото не создаёт копию, а возвращает имя уже
+сохранённого файла. Содержимое по такому адресу не меняется, поэтому
+``serve_media`` отдаёт его с заголовком ``immutable`` на год.
+Файл удаляется, когда на него не ссылается ни одна публикация
+(см. ``blog.signals``).
+"""
+import hashlib
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.views.static import serve
+
+HASH_CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+ADDRESSED_NAME_RE = re.compile(
+    r'(^|/)(?P<shard>[0-9a-f]{2})/[0-9a-f]{2}/(?P=shard)[0-9a-f]{62}(\.|$)'
+)
+
+
+def is_content_addressed(name):
+    """Имя файла или его копии (``hash.thumb.webp``) по содержимому."""
+    return bool(ADDRESSED_NAME_RE.search(name))
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, которое называет загрузки хэшем содержимого."""
+
+    def content_name(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        digest = content_hash(content)
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], digest + extension
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        # Копии фото получают имена от адреса оригинала и пишутся как есть.
+        if not is_content_addressed(name):
+            name = self.content_name(name, content)
+            if self.exists(name):
+                return name
+        return super().save(name, content, max_length)
+
+    def save_exact(self, name, content, max_length=None):
+        """Сохраняет файл под переданным именем, не заменяя его хэшем."""
+        return super().save(name, content, max_length)
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Отдаёт медиафайлы; файлы с адресом по содержимому — навсегда."""
+    if document_root is None:
+        document_root = settings.MEDIA_ROOT
+    response = serve(request, path, document_root, show_indexes)
+    if is_content_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
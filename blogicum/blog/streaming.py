@@ -0,0 +1,163 @@
+"""
+Потоковая отдача длинных страниц.
+
+Шаблон отрисовывается по частям уже при отправке ответа: сначала
+верхние узлы базового шаблона (``<head>``, шапка), затем блоки
+страницы. Циклы ``{% stream_for %}`` оставляют в блоке метку, а их
+элементы (карточки публикаций, комментарии) отрисовываются по одному.
+Запросы к базе, сделанные во время отправки, учитывают
+``blog.metrics`` и ``blog.profiling`` (см. ``iterate_within``).
+"""
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.template import Context
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY,
+    BlockContext,
+    BlockNode,
+    ExtendsNode,
+)
+
+STREAM_CONTEXT_KEY = '_blog_stream'
+_DONE = object()
+
+
+class StreamSections:
+    """Отложенные циклы страницы в порядке их появления в разметке."""
+
+    def __init__(self):
+        self.marker = f'<!--blog-stream:{uuid.uuid4().hex}-->'
+        self.sections = deque()
+
+    def defer(self, node, items, context):
+        self.sections.append(
+            (node, items, context.flatten(), context.template,
+             context.autoescape)
+        )
+        return self.marker
+
+    def render(self, chunks):
+        for chunk in chunks:
+            parts = chunk.split(self.marker)
+            if parts[0]:
+                yield parts[0]
+            for tail in parts[1:]:
+                yield from self._render_section(*self.sections.popleft())
+                if tail:
+                    yield tail
+
+    def _render_section(self, node, items, values, template, autoescape):
+        context = Context(values, autoescape=autoescape)
+        with context.render_context.push_state(template), \
+                context.bind_template(template):
+            for item in items:
+                yield node.render_item(context, item)
+
+
+def _iter_extends(node, context):
+    # То же, что ExtendsNode.render, но узлы родителя отдаются по одному.
+    parent = node.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+    for child in parent.nodelist:
+        if not isinstance(child, TextNode):
+            if not isinstance(child, ExtendsNode):
+                block_context.add_blocks({
+                    block.name: block
+                    for block in parent.nodelist.get_nodes_by_type(BlockNode)
+                })
+            break
+    with context.render_context.push_state(parent, isolated_context=False):
+        yield from _iter_nodes(parent.nodelist, context)
+
+
+def _iter_nodes(nodelist, context):
+    # Части отдаются перед каждым блоком: ради блока и стоит ждать.
+    rendered = []
+    for node in nodelist:
+        if isinstance(node, (ExtendsNode, BlockNode)):
+            yield ''.join(rendered)
+            rendered = []
+        if isinstance(node, ExtendsNode):
+            yield from _iter_extends(node, context)
+        else:
+            rendered.append(str(node.render_annotated(context)))
+    yield ''.join(rendered)
+
+
+def iter_template(template, context):
+    """
+    Отрисовывает шаблон (``django.template.Template``) по верхним узлам
+    самого базового шаблона, не дожидаясь блоков ниже по странице.
+    """
+    with context.render_context.push_state(template), \
+            context.bind_template(template):
+        context.template_name = template.name
+        yield from _iter_nodes(template.nodelist, context)
+
+
+def iterate_within(chunks, scope, on_close=None):
+    """
+    Отдаёт части потокового ответа, получая каждую внутри контекстного
+    менеджера ``scope()``; когда ответ отправлен или прерван, вызывает
+    ``on_close``.
+    """
+    chunks = iter(chunks)
+    try:
+        while True:
+            with scope():
+                chunk = next(chunks, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        if on_close is not None:
+            on_close()
+
+
+def streaming_enabled():
+    return getattr(settings, 'BLOG_STREAMING', False)
+
+
+class StreamingResponseMixin:
+    """
+    Отдаёт страницу ``StreamingHttpResponse`` при ``BLOG_STREAMING``.
+
+    По умолчанию режим выключен: обычный ответ несёт ``context``
+    для тестов и отладочных инструментов.
+    """
+
+    def render_to_response(self, context, **response_kwargs):
+        if not streaming_enabled():
+            return super().render_to_response(context, **response_kwargs)
+        sections = StreamSections()
+        context[STREAM_CONTEXT_KEY] = sections
+        response = super().render_to_response(context, **response_kwargs)
+        template = response.resolve_template(response.template_name)
+        context = make_context(
+            response.resolve_context(response.context_data),
+            response._request,
+            autoescape=template.backend.engine.autoescape,
+        )
+        return StreamingHttpResponse(
+            sections.render(iter_template(template.template, context)),
+            content_type=response['Content-Type'],
+            status=response.status_code,
+        )
+
+
+def cache_streamed_content(chunks, key, content_type, timeout):
+    """Передаёт части ответа дальше и кэширует страницу целиком."""
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    cache.set(key, (b''.join(content), content_type), timeout)
@@ -0,0 +1,32 @@
+from django.utils import timezone
+
+from .cache import category_tag, feed_tag, invalidate_tags, post_tag
+from .images import generate_variants, variant_names
+from .jobs import task
+from .models import Post
+from .storage import is_content_addressed
+
+
+@task('blog.image_variants')
+def build_image_variants(post_id, image_name):
+    """Создаёт копии фото публикации, если фото с тех пор не сменилось."""
+    post = Post.objects.select_related('category').filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        return {'generated': False, 'stale': True}
+    storage = post.image.storage
+    # Копии того же содержимого уже сделаны для другой публикации.
+    shared = is_content_addressed(image_name) and all(
+        storage.exists(name) for name in variant_names(image_name)
+    )
+    if not shared and not generate_variants(post.image):
+        return {'generated': False, 'stale': False}
+    Post.objects.filter(pk=post_id, image=image_name).update(
+        image_variants_source=image_name,
+        updated_at=timezone.now(),
+    )
+    invalidate_tags(
+        feed_tag(),
+        post_tag(post_id),
+        *([category_tag(post.category.slug)] if post.category else []),
+    )
+    return {'generated': True, 'stale': False}
@@ -0,0 +1,69 @@
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import get_or_render, post_card_cache_key
+from blog.streaming import STREAM_CONTEXT_KEY
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка публикации из кэша фрагментов."""
+    return mark_safe(get_or_render(
+        post_card_cache_key(post),
+        lambda: render_to_string('includes/post_card.html', {'post': post}),
+        getattr(settings, 'POST_CARD_CACHE_TIMEOUT', 60 * 60),
+    ))
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """
+    Ссылка на другую страницу списка с сохранением остальных параметров
+    запроса (например, ``q`` в поиске).
+    """
+    query = context['request'].GET.copy()
+    for key in ('page', 'after', 'before'):
+        query.pop(key, None)
+    for key, value in params.items():
+        query[key] = '' if value is None else value
+    return f'?{query.urlencode()}'
+
+
+class StreamForNode(template.Node):
+    def __init__(self, loopvar, sequence, nodelist):
+        self.loopvar = loopvar
+        self.sequence = sequence
+        self.nodelist = nodelist
+
+    def render_item(self, context, item):
+        with context.push(**{self.loopvar: item}):
+            return self.nodelist.render(context)
+
+    def render(self, context):
+        items = self.sequence.resolve(context, ignore_failures=True) or ()
+        sections = context.get(STREAM_CONTEXT_KEY)
+        if sections is not None:
+            return sections.defer(self, items, context)
+        return ''.join(self.render_item(context, item) for item in items)
+
+
+@register.tag
+def stream_for(parser, token):
+    """
+    Цикл ``{% stream_for item in items %}…{% endstream_for %}``.
+
+    В потоковом режиме элементы отрисовываются при отправке ответа;
+    переменная ``forloop`` в теле цикла недоступна.
+    """
+    bits = token.split_contents()
+    if len(bits) != 4 or bits[2] != 'in':
+        raise template.TemplateSyntaxError(
+            "'stream_for' ожидает вид: stream_for item in items"
+        )
+    nodelist = parser.parse(('endstream_for',))
+    parser.delete_first_token()
+    return StreamForNode(bits[1], parser.compile_filter(bits[3]), nodelist)
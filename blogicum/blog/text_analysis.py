@@ -0,0 +1,152 @@
+"""
+Разбор русского текста для поисковых индексов.
+
+``analyze`` делит текст на слова, приводит их к нижнему регистру,
+заменяет «ё» на «е», отбрасывает стоп-слова и сокращает русские слова
+до основы облегчённым стеммером Портера (алгоритм Snowball для русского
+языка). Основы кэшируются: словарь живого текста невелик, и повторные
+слова обходятся без разбора окончаний.
+"""
+import re
+from functools import lru_cache
+
+MAX_TERM_LENGTH = 64
+STEM_CACHE_SIZE = 100_000
+
+_TOKEN_RE = re.compile(r'\w+')
+_CYRILLIC_RE = re.compile('[а-я]')
+
+VOWELS = frozenset('аеиоуыэюя')
+
+STOPWORDS = frozenset('''
+    а без более бы был была были было быть в вам вас ведь весь во вот все
+    всего всех вы где да даже для до его ее ей ему если есть еще же за здесь
+    и из или им их к как какая какой когда кто куда ли между меня мне много
+    может мой моя мы на над надо не него нее нельзя нет ни ним них но ну о
+    об один он она они оно опять от перед по под после потом потому почти
+    при про раз с сам свою себе себя со совсем так такой там тебя тем теперь
+    то тогда того тоже только том тот три тут ты у уж уже хоть чего чем
+    через что чтоб чтобы чуть эти этого этой этом этот эту я
+'''.split())
+
+PERFECTIVE_GERUND = (
+    ('вшись', 'вши', 'в'),
+    ('ывшись', 'ившись', 'ывши', 'ивши', 'ыв', 'ив'),
+)
+REFLEXIVE = ('ся', 'сь')
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое', 'ей',
+    'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую', 'юю', 'ая',
+    'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+VERB = (
+    ('ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'й', 'л', 'н'),
+    ('ейте', 'уйте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло',
+     'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей', 'уй', 'ил', 'ыл',
+     'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую', 'ю'),
+)
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие', 'ье',
+    'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию',
+    'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре, «ё» приводится к «е»."""
+    return [
+        token.replace('ё', 'е')
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def _regions(word):
+    """Начала областей RV и R2 в терминах алгоритма Snowball."""
+    rv = r1 = r2 = len(word)
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            rv = index + 1
+            break
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r1 = index + 1
+            break
+    for index in range(r1 + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r2
+
+
+def _remove(word, start, endings, after_a=False):
+    """
+    Отрезает самое длинное окончание из ``endings`` внутри области,
+    начинающейся с ``start``; ``after_a`` требует перед окончанием «а»
+    или «я». Возвращает слово без окончания или None.
+    """
+    for ending in sorted(endings, key=len, reverse=True):
+        if not word.endswith(ending) or len(word) - len(ending) < start:
+            continue
+        stem = word[:-len(ending)]
+        if after_a and (len(stem) <= start or stem[-1] not in 'ая'):
+            continue
+        return stem
+    return None
+
+
+def _remove_grouped(word, start, groups):
+    first, second = groups
+    return (
+        _remove(word, start, second)
+        or _remove(word, start, first, after_a=True)
+    )
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    """Основа русского слова; слова без кириллицы не меняются."""
+    if not _CYRILLIC_RE.search(word):
+        return word
+    rv, r2 = _regions(word)
+
+    stemmed = _remove_grouped(word, rv, PERFECTIVE_GERUND)
+    if stemmed is None:
+        word = _remove(word, rv, REFLEXIVE) or word
+        adjective = _remove(word, rv, ADJECTIVE)
+        if adjective is not None:
+            stemmed = _remove_grouped(adjective, rv, PARTICIPLE) or adjective
+        else:
+            stemmed = (
+                _remove_grouped(word, rv, VERB)
+                or _remove(word, rv, NOUN)
+            )
+    word = stemmed if stemmed is not None else word
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _remove(word, r2, DERIVATIONAL) or word
+
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _remove(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        if word.endswith('нн') and len(word) - 2 >= rv:
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def analyze(text):
+    """Основы значимых слов текста в порядке появления."""
+    return [stem(token) for token in tokenize(text) if token not in STOPWORDS]
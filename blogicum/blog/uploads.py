@@ -0,0 +1,134 @@
+"""
+Проверка загружаемых фото публикаций.
+
+Загрузка пишется на диск частями (``LimitedTemporaryFileUploadHandler``)
+и не попадает в память целиком; после ``BLOG_UPLOAD_MAX_BYTES`` байт
+запись прекращается. Размер, формат и число пикселей проверяются по
+заголовку файла — до того, как Pillow начнёт разворачивать картинку.
+Прошедшее проверку фото перекодируется без EXIF: вместе с ним уходят
+координаты съёмки и данные камеры.
+"""
+import os
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+    'GIF': {},
+}
+
+
+def max_bytes():
+    return getattr(settings, 'BLOG_UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def max_pixels():
+    return getattr(settings, 'BLOG_UPLOAD_MAX_PIXELS', 40_000_000)
+
+
+def allowed_formats():
+    return getattr(
+        settings, 'BLOG_UPLOAD_FORMATS', ('JPEG', 'PNG', 'GIF', 'WEBP')
+    )
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Сохраняет загрузку во временный файл и перестаёт писать после
+    ``BLOG_UPLOAD_MAX_BYTES`` байт. Полный размер файла сохраняется,
+    и проверка отклонит такую загрузку, не читая её.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= max_bytes():
+            self.file.write(raw_data)
+
+
+def check_image_header(upload):
+    """
+    Проверяет размер, формат и число пикселей загрузки по заголовку;
+    возвращает формат изображения.
+    """
+    if upload.size > max_bytes():
+        raise ValidationError(
+            'Файл больше %(limit)s.',
+            code='file_too_large',
+            params={'limit': filesizeformat(max_bytes())},
+        )
+    too_many_pixels = ValidationError(
+        'Изображение больше %(limit)s мегапикселей.',
+        code='too_many_pixels',
+        params={'limit': round(max_pixels() / 1_000_000, 1)},
+    )
+    upload.seek(0)
+    try:
+        # open() читает только заголовок; пиксели не разворачиваются.
+        with Image.open(upload) as image:
+            image_format = image.format
+            width, height = image.size
+    except Image.DecompressionBombError:
+        raise too_many_pixels
+    except Exception:
+        raise ValidationError(
+            'Загрузите правильное изображение.', code='invalid_image'
+        )
+    finally:
+        upload.seek(0)
+    if width * height > max_pixels():
+        raise too_many_pixels
+    if image_format not in allowed_formats():
+        raise ValidationError(
+            'Формат %(format)s не поддерживается.',
+            code='invalid_format',
+            params={'format': image_format},
+        )
+    return image_format
+
+
+def strip_metadata(upload, image_format):
+    """
+    Перекодирует проверенное фото без EXIF, повернув его по метке
+    ориентации. Результат пишется во временный файл на диске.
+    """
+    with Image.open(upload) as image:
+        animated = getattr(image, 'is_animated', False)
+        if animated:
+            image.load()
+            cleaned = image
+        else:
+            cleaned = ImageOps.exif_transpose(image)
+        result = TemporaryUploadedFile(
+            os.path.basename(upload.name),
+            Image.MIME.get(image_format, upload.content_type), 0, None,
+        )
+        cleaned.save(
+            result, image_format, exif=b'', save_all=animated,
+            **SAVE_OPTIONS.get(image_format, {}),
+        )
+    result.size = result.tell()
+    result.seek(0)
+    return result
+
+
+class UploadImageField(forms.ImageField):
+    """Поле фото, которое проверяет заголовок до разбора картинки."""
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return None
+        image_format = check_image_header(data)
+        super().to_python(data)
+        return strip_metadata(data, image_format)
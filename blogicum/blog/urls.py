@@ -18,6 +18,9 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/',
          views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(),
+         name='comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
@@ -30,6 +33,9 @@ urlpatterns = [
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(),
          name='category_posts'),
+    path('search/',
+         views.SearchView.as_view(),
+         name='search'),
     path('profile/<str:username>/',
          views.ProfileListView.as_view(),
          name='profile'),
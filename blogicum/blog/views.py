@@ -1,4 +1,6 @@
-import datetime as dt
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, Http404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import (
@@ -11,22 +13,48 @@ from django.views.generic import (
 from django.urls import reverse_lazy, reverse
 from .models import Post, Category, Comment, User
 from .forms import PostForm, UserForm, CommentForm
-from django.db.models import Count
+from .cache import (
+    category_tag,
+    feed_tag,
+    page_cache_key,
+    post_tag,
+)
+from .paginators import CursorPaginator, InvalidCursor
+from .profiling import record_cache_access
+from .routers import read_from_replicas, stream_from_replicas
+from .search import search
+from .streaming import StreamingResponseMixin, cache_streamed_content
+from .visibility import visibility_timeout
+from django.db import transaction
 
 NUMBER_OF_RECORDS = 10
+COMMENTS_PER_PAGE = 10
+COMMENT_ORDERING = ('create_at', 'id')
+
+
+class CachedObjectMixin:
+    """
+    Загружает объект представления один раз за запрос: проверка прав
+    в ``dispatch`` и обработчики ``get``/``post``/``delete`` получают
+    один и тот же экземпляр.
+    """
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object(queryset)
+        return self._cached_object
 
 
-class CustomSettingsCommentMixin(LoginRequiredMixin):
+class CustomSettingsCommentMixin(CachedObjectMixin, LoginRequiredMixin):
     model = Comment
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
+    def get_queryset(self):
+        return super().get_queryset().filter(post_id=self.kwargs['post_id'])
+
     def dispatch(self, request, *args, **kwargs):
-        comment = get_object_or_404(
-            Comment,
-            id=self.kwargs['comment_id']
-        )
-        if request.user != comment.author:
+        if request.user.id != self.get_object().author_id:
             return redirect(
                 'blog:post_detail', self.kwargs['post_id']
             )
@@ -40,59 +68,220 @@ class CustomSettingsCommentMixin(LoginRequiredMixin):
         )
 
 
-class PostListView(ListView):
+class CursorPaginationMixin:
+    """
+    Добавляет спискам режим постраничного вывода по курсору.
+
+    Режим включается параметрами ``?after=``/``?before=`` или настройкой
+    ``BLOG_PAGINATION_MODE = 'cursor'``; запрос с ``?page=`` всегда
+    обслуживается обычным нумерованным пагинатором.
+    """
+
+    cursor_ordering = ('-pub_date', '-id')
+    pagination_mode = None
+
+    def use_cursor_pagination(self):
+        params = self.request.GET
+        if 'after' in params or 'before' in params:
+            return True
+        mode = self.pagination_mode or getattr(
+            settings, 'BLOG_PAGINATION_MODE', 'numbered'
+        )
+        return mode == 'cursor' and self.page_kwarg not in params
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after') or None,
+                before=self.request.GET.get('before') or None,
+            )
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ReplicaReadMixin:
+    """
+    Читает данные страницы с реплик базы (см. ``blog.routers``),
+    включая отложенную отрисовку шаблона и потоковые части ответа.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replicas() as scope:
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        if response.streaming:
+            response.streaming_content = stream_from_replicas(
+                response.streaming_content, scope
+            )
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """
+    Отдаёт анонимным читателям GET-страницы из кэша.
+
+    Ключ страницы учитывает путь, параметры запроса (номер страницы,
+    курсор) и версии тегов из ``get_page_cache_tags``; сигналы моделей
+    сбрасывают версии тегов при изменении данных, а срок хранения
+    не переживает ближайшую отложенную публикацию.
+    """
+
+    def get_page_cache_tags(self):
+        raise NotImplementedError
+
+    def get_page_cache_timeout(self):
+        return visibility_timeout(
+            getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 60 * 5)
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        tags = self.get_page_cache_tags()
+        if tags is None:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, tags)
+        cached = cache.get(key)
+        record_cache_access(cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if response.streaming:
+            response.streaming_content = cache_streamed_content(
+                response.streaming_content,
+                key,
+                response['Content-Type'],
+                self.get_page_cache_timeout(),
+            )
+            return response
+        if hasattr(response, 'render'):
+            response.render()
+        cache.set(
+            key,
+            (response.content, response['Content-Type']),
+            self.get_page_cache_timeout(),
+        )
+        return response
+
+
+class PostListView(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    StreamingResponseMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/index.html'
     ordering = ['-pub_date']
     paginate_by = NUMBER_OF_RECORDS
 
+    def get_page_cache_tags(self):
+        return [feed_tag()]
+
     def get_queryset(self):
         return super(
             PostListView, self
-        ).get_queryset().filter(
-            pub_date__lte=dt.datetime.now(),
-            is_published=True,
-            category__is_published=True
-        ).select_related(
+        ).get_queryset().published().select_related(
             'category',
             'location',
             'author'
-        ).annotate(
-            comment_count=Count(
-                'comments'
-            )
         )
 
 
-class PostDetailView(DetailView):
+class PostPageCacheMixin(AnonymousPageCacheMixin):
+    """
+    Кэш страниц публикации. Ключ зависит только от тега публикации,
+    чтобы не читать её из базы до проверки кэша: изменения категории
+    и местоположения сбрасывают теги своих публикаций (``blog.signals``).
+    """
+
+    def get_page_cache_tags(self):
+        return [post_tag(self.kwargs['post_id'])]
+
+
+class PostDetailView(
+    ReplicaReadMixin, PostPageCacheMixin, StreamingResponseMixin, DetailView
+):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(
-            Post.objects.select_related(
-                'category',
-                'location',
-            ),
-            pk=self.kwargs['post_id'],
+    def get_queryset(self):
+        return super().get_queryset().visible_to(
+            self.request.user
+        ).select_related(
+            'category',
+            'location',
+            'author'
         )
-        if (
-                not post.is_published
-                or not post.category.is_published
-                or dt.datetime.date(post.pub_date) >= dt.datetime.now().date()
-        ) and self.request.user != post.author:
-            raise Http404
-        return super().dispatch(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author').order_by('create_at')
+        context['comments'] = CursorPaginator(
+            self.object.comments.select_related('author'),
+            COMMENTS_PER_PAGE,
+            COMMENT_ORDERING,
+        ).page()
+        return context
+
+
+class CommentListView(
+    ReplicaReadMixin, PostPageCacheMixin, CursorPaginationMixin, ListView
+):
+    """
+    Следующие страницы комментариев к публикации: HTML-фрагмент
+    для подгрузки на странице публикации или JSON при ``?format=json``.
+    """
+
+    template_name = 'includes/comment_list.html'
+    paginate_by = COMMENTS_PER_PAGE
+    cursor_ordering = COMMENT_ORDERING
+    pagination_mode = 'cursor'
+
+    def get_queryset(self):
+        self.post = get_object_or_404(
+            Post.objects.visible_to(self.request.user),
+            pk=self.kwargs['post_id'],
         )
+        return self.post.comments.select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.post
+        context['comments'] = context['page_obj']
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if self.request.GET.get('format') != 'json':
+            return response
+        page = context['page_obj']
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'create_at': comment.create_at.isoformat(),
+                }
+                for comment in page
+            ],
+            'next': page.next_cursor,
+            'html': response.rendered_content,
+        })
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -111,62 +300,78 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostUpdateView(LoginRequiredMixin, UpdateView):
+class PostUpdateView(CachedObjectMixin, LoginRequiredMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        if self.object.author != self.request.user:
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'author',
+            'category',
+            'location'
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+                request.user.is_authenticated
+                and self.get_object().author_id != request.user.id
+        ):
             return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().post(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
 
 
-class PostDeleteView(LoginRequiredMixin, DeleteView):
+class PostDeleteView(CachedObjectMixin, LoginRequiredMixin, DeleteView):
     model = Post
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(
-            Post.objects.select_related(
-                'category',
-                'location',
-            ),
-            pk=self.kwargs['post_id']
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'author',
+            'category',
+            'location'
         )
-        if post.author != self.request.user and not request.user.is_superuser:
+
+    def dispatch(self, request, *args, **kwargs):
+        post = self.get_object()
+        if (
+                post.author_id != request.user.id
+                and not request.user.is_superuser
+        ):
             raise Http404
         return super().dispatch(request, *args, **kwargs)
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    StreamingResponseMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/category.html'
     slug_url_kwarg = 'category_slug'
     ordering = ['-pub_date']
     paginate_by = NUMBER_OF_RECORDS
 
+    def get_page_cache_tags(self):
+        return [category_tag(self.kwargs['category_slug'])]
+
     def get_queryset(self):
         return super(
             CategoryListView, self
-        ).get_queryset().filter(
+        ).get_queryset().published().filter(
             category__slug=self.kwargs.get(
                 'category_slug'
-            ), is_published=True,
-            pub_date__lte=dt.datetime.now().date(),
-            category__is_published=True
+            )
         ).select_related(
             'category',
             'location',
             'author'
-        ).annotate(
-            comment_count=Count(
-                'comments'
-            )
         )
 
     def get_context_data(self, *, object_list=None, **kwargs):
@@ -184,6 +389,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
 
+    @transaction.atomic
     def form_valid(self, form):
         post = get_object_or_404(Post, id=self.kwargs['post_id'])
         form.instance.author = self.request.user
@@ -208,8 +414,46 @@ class CommentDeleteView(CustomSettingsCommentMixin, DeleteView):
     Класс использует миксины.
     """
 
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+
+class SearchView(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    StreamingResponseMixin,
+    ListView,
+):
+    template_name = 'blog/search.html'
+    paginate_by = NUMBER_OF_RECORDS
+
+    def get_page_cache_tags(self):
+        return [feed_tag()]
 
-class ProfileListView(ListView):
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search(
+            Post.objects.published().select_related(
+                'category',
+                'location',
+                'author'
+            ),
+            self.query,
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class ProfileListView(
+    ReplicaReadMixin,
+    CursorPaginationMixin,
+    StreamingResponseMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/profile.html'
     ordering = ['-pub_date']
@@ -218,7 +462,7 @@ class ProfileListView(ListView):
     def get_queryset(self):
         return super(
             ProfileListView, self
-        ).get_queryset().filter(
+        ).get_queryset().visible_to(self.request.user).filter(
             author__username=self.kwargs.get(
                 'username'
             )
@@ -226,10 +470,6 @@ class ProfileListView(ListView):
             'category',
             'location',
             'author'
-        ).annotate(
-            comment_count=Count(
-                'comments'
-            )
         )
 
     def get_context_data(self, *, object_list=None, **kwargs):
@@ -0,0 +1,80 @@
+import datetime as dt
+import math
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post
+
+# Отправляется командой publish_scheduled для каждой отложенной
+# публикации, дата которой наступила; аргумент ``post``.
+post_became_visible = Signal()
+
+NEXT_CHANGE_KEY = 'blog:next_visibility_change'
+NO_CHANGE = 0
+
+
+def next_visibility_change():
+    """
+    Ближайшая дата в будущем, когда станет видна отложенная публикация,
+    или None, если таких публикаций нет.
+    """
+    now = timezone.now()
+    cached = cache.get(NEXT_CHANGE_KEY)
+    if cached == NO_CHANGE:
+        return None
+    if cached is not None and cached > now.timestamp():
+        return dt.datetime.fromtimestamp(cached, tz=dt.timezone.utc)
+    change = Post.objects.filter(
+        is_scheduled=True,
+        is_published=True,
+        pub_date__gt=now,
+    ).aggregate(next_change=Min('pub_date'))['next_change']
+    cache.set(
+        NEXT_CHANGE_KEY,
+        change.timestamp() if change else NO_CHANGE,
+        None,
+    )
+    return change
+
+
+def forget_next_visibility_change():
+    cache.delete(NEXT_CHANGE_KEY)
+
+
+def visibility_timeout(timeout):
+    """Срок кэширования, не переживающий ближайшую смену видимости."""
+    change = next_visibility_change()
+    if change is None:
+        return timeout
+    seconds = math.ceil((change - timezone.now()).total_seconds())
+    return max(1, min(timeout, seconds))
+
+
+def announce_visible_posts():
+    """
+    Снимает отметку отложенной публикации с постов, дата которых
+    наступила, и отправляет для видимых из них ``post_became_visible``.
+    """
+    due = list(
+        Post.objects.filter(
+            is_scheduled=True, pub_date__lte=timezone.now()
+        ).select_related('category')
+    )
+    if not due:
+        return []
+    Post.objects.filter(pk__in=[post.pk for post in due]).update(
+        is_scheduled=False
+    )
+    forget_next_visibility_change()
+    visible = [
+        post for post in due
+        if post.is_published
+        and post.category is not None
+        and post.category.is_published
+    ]
+    for post in visible:
+        post_became_visible.send(sender=Post, post=post)
+    return visible
@@ -41,12 +41,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.metrics.MetricsMiddleware',
+    'blog.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'blog.routers.ReplicaPinMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -74,13 +77,44 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Бэкенд blog.backends.sqlite3 выполняет PRAGMA при подключении и
+# открывает транзакции как BEGIN IMMEDIATE; см. его DEFAULT_PRAGMAS.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blog.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 5000,
+                'mmap_size': 128 * 1024 * 1024,
+                'cache_size': -16000,
+                'temp_store': 'MEMORY',
+            },
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Соединение с базой переходит к следующему запросу процесса, пока не
+# истёк CONN_MAX_AGE; перед этим оно проверяется запросом SELECT 1.
+BLOG_CONN_HEALTH_CHECKS = True
+
+# Реплики для чтения публичных страниц: псевдонимы из DATABASES, например
+# DATABASES['replica'] = {'ENGINE': ..., 'NAME': ...} и
+# BLOG_READ_REPLICAS = ['replica']. Недоступная реплика пропускается
+# BLOG_REPLICA_HEALTH_INTERVAL секунд; после записи пользователь читает
+# из основной базы ещё BLOG_REPLICA_PIN_SECONDS секунд.
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+BLOG_READ_REPLICAS = []
+
+BLOG_REPLICA_HEALTH_INTERVAL = 5
+
+BLOG_REPLICA_PIN_SECONDS = 10
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -141,3 +175,78 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 LOGIN_URL = 'login'
+
+# 'numbered' — нумерованные страницы, 'cursor' — вывод по курсору.
+BLOG_PAGINATION_MODE = 'numbered'
+
+# Очередь исходящей почты: базовая пауза перед повтором (секунд,
+# удваивается с каждой попыткой) и число попыток до отказа.
+OUTBOX_RETRY_DELAY = 60
+
+OUTBOX_MAX_ATTEMPTS = 5
+
+# На сколько секунд обработчик забирает письмо перед отправкой: другие
+# обработчики его не трогают, а после сбоя оно снова уйдёт в отправку.
+OUTBOX_CLAIM_TIMEOUT = 300
+
+# Фоновые задачи (manage.py runworker): число одновременно выполняемых
+# задач, базовая пауза перед повтором (секунд, удваивается с каждой
+# попыткой), число попыток и время, после которого задача погибшего
+# обработчика возвращается в очередь. JOBS_EAGER выполняет задачи сразу.
+JOBS_CONCURRENCY = 2
+
+JOBS_RETRY_DELAY = 30
+
+JOBS_MAX_ATTEMPTS = 3
+
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+JOBS_EAGER = False
+
+# Загрузка фото публикаций: файлы пишутся на диск частями, а не в память.
+# Ограничения проверяются по заголовку файла до разбора картинки.
+FILE_UPLOAD_HANDLERS = ['blog.uploads.LimitedTemporaryFileUploadHandler']
+
+BLOG_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+BLOG_UPLOAD_MAX_PIXELS = 40_000_000
+
+BLOG_UPLOAD_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Общий для всех процессов кэш: версии тегов страниц, сброшенные
+# командами (publish_scheduled, runworker, fastload), видят и
+# WSGI-процессы.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+# Время жизни карточки публикации в кэше фрагментов, секунд.
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Время жизни страниц, закэшированных для анонимных читателей, секунд.
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Потоковая отдача лент и страниц публикаций (StreamingHttpResponse).
+BLOG_STREAMING = False
+
+# Поисковый индекс: 'fts5' (SQLite FTS5), 'terms' (таблица терминов)
+# или 'auto' — FTS5, если миграция смогла создать его таблицу.
+BLOG_SEARCH_BACKEND = 'auto'
+
+# Профилирование запросов: сбор статистики по представлениям
+# и каталог снимков для команды profiling_report.
+BLOG_PROFILING = False
+
+BLOG_PROFILING_DIR = None
+
+# Метрики Prometheus на /metrics. Под несколькими процессами задайте общий
+# каталог BLOG_METRICS_DIR: каждый процесс сбрасывает туда свои значения
+# не чаще раза в BLOG_METRICS_FLUSH_INTERVAL секунд.
+BLOG_METRICS = True
+
+BLOG_METRICS_DIR = None
+
+BLOG_METRICS_FLUSH_INTERVAL = 1
@@ -13,19 +13,26 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include, reverse_lazy
+from django.urls import path, include, re_path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
-from django.conf.urls.static import static
 from django.conf import settings
 
+from blog.metrics import metrics_view
+from blog.profiling import profiling_report
+from blog.storage import serve_media
+
 handler403 = 'pages.views.csrf_failure'
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
 
 
 urlpatterns = [
+    path('metrics', metrics_view, name='metrics'),
+    path('admin/profiling/', profiling_report, name='profiling_report'),
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls')),
     path('', include('blog.urls')),
@@ -36,4 +43,11 @@ urlpatterns = [
         success_url=reverse_lazy('blog:index')
     ), name='registration', ),
 ]
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Медиафайлы отдаются и при DEBUG = False, в отличие от static(): иначе
+# фото с адресом по содержимому теряют заголовок immutable.
+urlpatterns += [
+    re_path(
+        r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+        serve_media,
+    ),
+]
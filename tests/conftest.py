@@ -18,6 +18,7 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.core.cache import caches
 from django.contrib.auth import get_user_model
 from django.db.models import Model, Field
 from django.forms import BaseForm
@@ -41,6 +42,37 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope='session', autouse=True)
+def cache_dir(tmp_path_factory):
+    # Файловый кэш тестов пишется во временный каталог, а не в проект.
+    # Поэтому модули тестов берут кэш через caches['default'], а не
+    # прокси cache: pytest при сборе обращается к атрибутам модулей, и
+    # прокси создал бы кэш (и его каталог) по настройкам проекта.
+    location = str(tmp_path_factory.mktemp('cache'))
+    with override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': location,
+    }}):
+        yield location
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # База данных откатывается между тестами без сигналов моделей,
+    # поэтому закэшированные страницы и фрагменты сбрасываются явно.
+    caches['default'].clear()
+    yield
+    caches['default'].clear()
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    # Загруженные в тестах фото и их копии пишутся во временный каталог;
+    # фоновые задачи выполняются сразу.
+    with override_settings(MEDIA_ROOT=str(tmp_path), JOBS_EAGER=True):
+        yield tmp_path
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -93,6 +125,7 @@ pytest_plugins = [
     "fixtures.categories",
     "fixtures.comments",
     "adapters.comment",
+    "fixtures.benchmark",
 ]
 
 
@@ -363,6 +396,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,113 @@
+import os
+import random
+from datetime import timedelta
+from typing import NamedTuple
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import Model
+from django.utils import timezone
+
+from blog.comment_counts import recount_comments
+from blog.models import Category, Comment, Location, Post
+
+BATCH_SIZE = 1000
+
+
+class BenchDataset(NamedTuple):
+    author: Model
+    post: Post
+    comment: Comment
+    category: Category
+
+
+def bench_size(name: str, default: int) -> int:
+    """Размер синтетических данных из переменной окружения BENCH_<NAME>."""
+    return int(os.environ.get(f'BENCH_{name.upper()}', default))
+
+
+def seed_dataset(n_users: int, n_posts: int, n_comments: int) -> BenchDataset:
+    rnd = random.Random(0)
+    now = timezone.now()
+    User = get_user_model()
+    User.objects.bulk_create(
+        (User(username=f'bench_user_{i}', password='!')
+         for i in range(n_users)),
+        batch_size=BATCH_SIZE,
+    )
+    users = list(User.objects.filter(username__startswith='bench_user_'))
+    Category.objects.bulk_create(
+        Category(
+            title=f'Категория {i}', description='Описание',
+            slug=f'bench-category-{i}', is_published=i != 0,
+        )
+        for i in range(5)
+    )
+    categories = list(Category.objects.filter(slug__startswith='bench-'))
+    Location.objects.bulk_create(
+        Location(name=f'Место {i}') for i in range(10)
+    )
+    locations = list(Location.objects.filter(name__startswith='Место '))
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=f'Публикация {i}',
+                text='Текст публикации ' * 20,
+                pub_date=now - timedelta(minutes=i + 1),
+                author=rnd.choice(users),
+                category=rnd.choice(categories),
+                location=rnd.choice(locations + [None]),
+                is_published=rnd.random() > 0.05,
+            )
+            for i in range(n_posts)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    post_ids = list(
+        Post.objects.filter(title__startswith='Публикация ')
+        .values_list('id', flat=True)
+    )
+    user_ids = [user.id for user in users]
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                text=f'Комментарий {i}',
+                post_id=rnd.choice(post_ids),
+                author_id=rnd.choice(user_ids),
+            )
+            for i in range(n_comments)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    recount_comments()
+    # Для маршрутов с параметрами — видимая публикация с комментарием
+    # её же автора.
+    post = Post.objects.published().select_related('author').first()
+    comment = Comment.objects.create(
+        text='Комментарий автора', post=post, author=post.author
+    )
+    return BenchDataset(
+        author=post.author, post=post, comment=comment,
+        category=post.category,
+    )
+
+
+def drop_dataset():
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    get_user_model().objects.filter(
+        username__startswith='bench_user_').delete()
+
+
+@pytest.fixture(scope='module')
+def bench_dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        dataset = seed_dataset(
+            n_users=bench_size('users', 20),
+            n_posts=bench_size('posts', 200),
+            n_comments=bench_size('comments', 1000),
+        )
+        yield dataset
+        drop_dataset()
@@ -0,0 +1,133 @@
+"""
+Замеры числа запросов, времени SQL и времени отрисовки для каждого
+именованного маршрута blog/urls.py и pages/urls.py.
+
+Размер синтетических данных задаётся переменными окружения
+BENCH_USERS, BENCH_POSTS и BENCH_COMMENTS, путь к JSON-отчёту —
+BENCH_REPORT. Тест падает, если число запросов превышает бюджет:
+бюджет не зависит от объёма данных, поэтому N+1 ловится и на малых.
+"""
+import json
+import os
+import time
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog import urls as blog_urls
+from pages import urls as pages_urls
+
+ROUTES = [
+    f'{module.app_name}:{pattern.name}'
+    for module in (blog_urls, pages_urls)
+    for pattern in module.urlpatterns
+]
+
+# Бюджеты запросов авторизованного автора публикации,
+# включая два запроса сессии и пользователя.
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:post_detail': 4,
+    'blog:create_post': 4,
+    'blog:edit_post': 5,
+    'blog:delete_post': 3,
+    'blog:add_comment': 8,
+    'blog:comments': 4,
+    'blog:edit_comment': 3,
+    'blog:delete_comment': 3,
+    'blog:category_posts': 5,
+    'blog:search': 4,
+    'blog:profile': 5,
+    'blog:edit_profile': 2,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+
+# Маршруты, которые обслуживают только POST-запросы.
+POST_DATA = {
+    'blog:add_comment': {'text': 'Комментарий из замера'},
+}
+
+_report = []
+
+
+class SqlTimer:
+    """Обёртка выполнения запросов, суммирующая их время."""
+
+    def __init__(self):
+        self.total = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += time.perf_counter() - started
+
+
+def _route_kwargs(route, dataset):
+    kwargs = {
+        'post_id': dataset.post.id,
+        'comment_id': dataset.comment.id,
+        'category_slug': dataset.category.slug,
+        'username': dataset.author.username,
+    }
+    pattern = next(
+        p for module in (blog_urls, pages_urls) for p in module.urlpatterns
+        if f'{module.app_name}:{p.name}' == route
+    )
+    return {
+        name: value for name, value in kwargs.items()
+        if name in pattern.pattern.converters
+    }
+
+
+@pytest.fixture(scope='module', autouse=True)
+def write_report():
+    yield
+    path = os.environ.get('BENCH_REPORT')
+    if path:
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(_report, fh, ensure_ascii=False, indent=2)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route', ROUTES)
+def test_route_query_budget(bench_dataset, route):
+    url = reverse(route, kwargs=_route_kwargs(route, bench_dataset))
+    client = Client()
+    client.force_login(bench_dataset.author)
+    caches['default'].clear()
+    method = 'post' if route in POST_DATA else 'get'
+    sql_timer = SqlTimer()
+    with CaptureQueriesContext(connection) as captured, \
+            connection.execute_wrapper(sql_timer):
+        started = time.perf_counter()
+        response = getattr(client, method)(url, data=POST_DATA.get(route))
+        wall_time = time.perf_counter() - started
+    queries = len(captured.captured_queries)
+    _report.append({
+        'route': route,
+        'url': url,
+        'method': method.upper(),
+        'status': response.status_code,
+        'queries': queries,
+        'sql_ms': round(1000 * sql_timer.total, 3),
+        'wall_ms': round(1000 * wall_time, 3),
+    })
+    assert response.status_code < 400, (
+        f'Маршрут `{route}` вернул статус {response.status_code}.'
+    )
+    assert route in QUERY_BUDGETS, (
+        f'Закрепите бюджет запросов для маршрута `{route}`'
+        ' в QUERY_BUDGETS (tests/test_benchmarks.py).'
+    )
+    assert queries <= QUERY_BUDGETS[route], (
+        f'Маршрут `{route}` выполнил {queries} запросов при бюджете'
+        f' {QUERY_BUDGETS[route]}:\n'
+        + '\n'.join(q['sql'] for q in captured.captured_queries)
+    )
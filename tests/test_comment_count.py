@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.comment_counts import recount_comments
+from blog.models import Comment, Post
+
+
+def _count(post):
+    return Post.objects.values_list(
+        'comment_count', flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_views(
+        user_client, user, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/comment/'
+    for i in range(3):
+        user_client.post(url, data={'text': f'Комментарий {i}'})
+    assert _count(post) == 3, (
+        'Убедитесь, что при добавлении комментария увеличивается'
+        ' счётчик `comment_count` публикации.'
+    )
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert _count(post) == 2, (
+        'Убедитесь, что при удалении комментария уменьшается'
+        ' счётчик `comment_count` публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_bulk_delete(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend('blog.Comment', post=post)
+    assert _count(post) == 4
+    Comment.objects.filter(post=post).delete()
+    assert _count(post) == 0
+
+
+@pytest.mark.django_db
+def test_list_views_read_comment_count_column(
+        client, mixer, post_with_published_location,
+        django_assert_num_queries):
+    mixer.cycle(2).blend('blog.Comment', post=post_with_published_location)
+    # Подсчёт, страница публикаций и поиск ближайшей отложенной
+    # публикации, до которой живёт кэш страницы.
+    with django_assert_num_queries(3) as captured:
+        response = client.get('/')
+    assert not any(
+        'GROUP BY' in query['sql'] for query in captured.captured_queries
+    ), 'Убедитесь, что списки публикаций не агрегируют комментарии.'
+    assert 'Комментарии (2)' in response.content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_recount_comments_command_repairs_drift(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    out = StringIO()
+    call_command('recount_comments', stdout=out)
+    assert _count(post) == 3, (
+        'Убедитесь, что команда `recount_comments` восстанавливает'
+        ' фактическое число комментариев.'
+    )
+    assert '1' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_recount_comments_updates_through_subquery(
+        mixer, user, django_assert_num_queries):
+    posts = mixer.cycle(20).blend('blog.Post', author=user)
+    Post.objects.update(comment_count=7)
+    with django_assert_num_queries(1) as captured:
+        assert recount_comments() == len(posts)
+    sql = captured.captured_queries[0]['sql']
+    assert sql.startswith('UPDATE') and 'SELECT' in sql, (
+        'Убедитесь, что разошедшиеся публикации выбираются подзапросом,'
+        ' а не списком id.'
+    )
+    assert not Post.objects.exclude(comment_count=0).exists()
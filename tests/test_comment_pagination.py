@@ -0,0 +1,82 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.views import COMMENTS_PER_PAGE
+
+N_COMMENTS = COMMENTS_PER_PAGE * 2 + 3
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    comments = mixer.cycle(N_COMMENTS).blend(
+        'blog.Comment', post=post_with_published_location, author=user,
+    )
+    # Одинаковое время у пар комментариев: порядок решает id.
+    now = timezone.now()
+    for index, comment in enumerate(comments):
+        Comment.objects.filter(pk=comment.pk).update(
+            create_at=now + timedelta(seconds=index // 2)
+        )
+    return list(
+        Comment.objects.filter(post=post_with_published_location)
+        .order_by('create_at', 'id')
+    )
+
+
+@pytest.mark.django_db
+def test_detail_renders_first_comment_page(
+        client, post_with_published_location, many_comments):
+    response = client.get(f'/posts/{post_with_published_location.id}/')
+    assert response.status_code == HTTPStatus.OK
+    comments = list(response.context['comments'])
+    assert comments == many_comments[:COMMENTS_PER_PAGE], (
+        'Убедитесь, что страница публикации выводит только первую'
+        ' страницу комментариев в порядке создания.'
+    )
+    assert response.context['comments'].has_next()
+    assert f'/posts/{post_with_published_location.id}/comments/?after=' in (
+        response.content.decode()
+    )
+
+
+@pytest.mark.django_db
+def test_comment_endpoint_walks_all_pages(
+        client, post_with_published_location, many_comments):
+    url = f'/posts/{post_with_published_location.id}/comments/'
+    seen = []
+    after = ''
+    while True:
+        response = client.get(url, {'after': after, 'format': 'json'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        seen.extend(item['id'] for item in data['comments'])
+        assert data['html'].count('name="comment_') == len(data['comments'])
+        if data['next'] is None:
+            break
+        after = data['next']
+    assert seen == [comment.id for comment in many_comments], (
+        'Убедитесь, что курсор по `(create_at, id)` обходит все комментарии'
+        ' без пропусков и повторов.'
+    )
+
+    response = client.get(url, {'after': after})
+    assert response['Content-Type'].startswith('text/html')
+    assert '<html' not in response.content.decode(), (
+        'Убедитесь, что без `format=json` возвращается HTML-фрагмент.'
+    )
+
+
+@pytest.mark.django_db
+def test_comment_endpoint_respects_visibility(
+        client, another_user_client, mixer, user):
+    post = mixer.blend('blog.Post', author=user, is_published=False)
+    url = f'/posts/{post.id}/comments/'
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert client.get(
+        '/posts/0/comments/', {'after': 'garbage'}
+    ).status_code == HTTPStatus.NOT_FOUND
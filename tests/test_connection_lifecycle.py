@@ -0,0 +1,141 @@
+"""
+Переиспользование соединений с базой и замер запросов в секунду.
+
+Замер идёт в отдельном процессе с базой в файле: соединение с тестовой
+базой в памяти Django никогда не закрывает. Путь к JSON-отчёту задаёт
+переменная окружения BENCH_CONN_REPORT, число запросов — BENCH_CONN_REQUESTS.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pytest
+from django.db import connections
+from django.test import override_settings
+
+from blog.db_lifecycle import check_connections, worker_stats
+
+ALIAS = 'lifecycle'
+
+
+@pytest.fixture
+def file_connection(tmp_path, django_db_blocker):
+    connections.settings[ALIAS] = {
+        **connections.settings['default'],
+        'NAME': str(tmp_path / 'lifecycle.sqlite3'),
+    }
+    with django_db_blocker.unblock():
+        yield connections[ALIAS]
+    connections[ALIAS].close()
+    del connections[ALIAS]
+    del connections.settings[ALIAS]
+
+
+def _stats():
+    return worker_stats().get(ALIAS, {})
+
+
+def _delta(before, after):
+    return {name: after.get(name, 0) - before.get(name, 0) for name in after}
+
+
+def test_dead_connection_replaced(file_connection):
+    before = _stats()
+    file_connection.ensure_connection()
+    check_connections()
+    # Соединение обрывается в обход Django, как при перезапуске сервера.
+    file_connection.connection.close()
+    check_connections()
+    stats = _delta(before, _stats())
+    assert stats['db_connections_opened_total'] == 1
+    assert stats['db_connections_reused_total'] == 1
+    assert stats['db_connections_dead_total'] == 1, (
+        'Убедитесь, что соединение проверяется перед повторным'
+        ' использованием.'
+    )
+    assert stats['db_connections_closed_total'] == 1
+    assert stats['open'] == 0
+    assert file_connection.connection is None
+
+    with file_connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    assert _delta(before, _stats())['open'] == 1
+
+    with override_settings(BLOG_CONN_HEALTH_CHECKS=False):
+        file_connection.connection.close()
+        check_connections()
+    assert _delta(before, _stats())['db_connections_dead_total'] == 1
+
+
+def _requests_per_second(path, requests):
+    import time
+    from io import BytesIO
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    settings.BLOG_METRICS_DIR = None
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.management import call_command
+    from django.db import connections
+
+    from blog.db_lifecycle import worker_stats
+
+    call_command('migrate', verbosity=0)
+    # Профиль не кэшируется, каждый запрос идёт в базу.
+    user = get_user_model().objects.create(username='bench')
+    url = f'/profile/{user.username}/'
+    handler = WSGIHandler()
+
+    def get():
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': url,
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(),
+        }
+        response = handler(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+
+    report = {}
+    for mode, max_age in (('no_reuse', 0), ('reuse', 60)):
+        connections['default'].close()
+        connections['default'].settings_dict['CONN_MAX_AGE'] = max_age
+        get()
+        before = worker_stats()['default']
+        started = time.perf_counter()
+        for _ in range(requests):
+            get()
+        elapsed = time.perf_counter() - started
+        after = worker_stats()['default']
+        report[mode] = {
+            'requests_per_second': round(requests / elapsed, 1),
+            **{name: after[name] - before[name] for name in (
+                'db_connections_opened_total',
+                'db_connections_reused_total',
+            )},
+        }
+    return report
+
+
+def test_connection_reuse_benchmark(tmp_path):
+    requests = int(os.environ.get('BENCH_CONN_REQUESTS', 100))
+    with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+        report = pool.submit(
+            _requests_per_second, str(tmp_path / 'bench.sqlite3'), requests
+        ).result()
+    assert report['no_reuse']['db_connections_opened_total'] == requests
+    assert report['reuse']['db_connections_opened_total'] == 0, (
+        'Убедитесь, что при CONN_MAX_AGE соединение переходит'
+        ' к следующему запросу.'
+    )
+    assert report['reuse']['db_connections_reused_total'] == requests
+    path = os.environ.get('BENCH_CONN_REPORT')
+    if path:
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
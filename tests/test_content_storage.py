@@ -0,0 +1,160 @@
+import hashlib
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.images import variant_names
+from blog.models import Post
+from blog.storage import IMMUTABLE_CACHE_CONTROL, serve_media
+
+
+def _photo_bytes(color='red'):
+    data = BytesIO()
+    Image.new('RGB', (64, 48), color).save(data, 'JPEG')
+    return data.getvalue()
+
+
+@pytest.fixture
+def blend_post_with_photo(mixer, user, published_category):
+    def blend(name, content):
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=None,
+        )
+        post.image = SimpleUploadedFile(name, content)
+        post.save()
+        post.refresh_from_db()
+        return post
+    return blend
+
+
+def _files(root):
+    return sorted(
+        str(path.relative_to(root)) for path in root.rglob('*')
+        if path.is_file()
+    )
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_one_file(media_root, blend_post_with_photo):
+    content = _photo_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    first = blend_post_with_photo('Photo.JPG', content)
+    second = blend_post_with_photo('copy.jpg', content)
+    assert first.image.name == (
+        f'post_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+    ), 'Убедитесь, что фото называется хэшем содержимого.'
+    assert second.image.name == first.image.name, (
+        'Убедитесь, что одинаковые фото не сохраняются повторно.'
+    )
+    assert _files(media_root) == sorted(
+        [first.image.name, *variant_names(first.image.name)]
+    )
+    assert first.has_image_variants and second.has_image_variants
+
+
+@pytest.mark.django_db
+def test_shared_file_removed_with_last_post(
+        media_root, blend_post_with_photo,
+        django_capture_on_commit_callbacks):
+    content = _photo_bytes()
+    first = blend_post_with_photo('a.jpg', content)
+    second = blend_post_with_photo('b.jpg', content)
+    name = first.image.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert (media_root / name).exists(), (
+        'Убедитесь, что фото, которое есть у другой публикации,'
+        ' не удаляется.'
+    )
+    assert all((media_root / variant).exists()
+               for variant in variant_names(name))
+
+    second.image = SimpleUploadedFile('c.jpg', _photo_bytes('blue'))
+    with django_capture_on_commit_callbacks(execute=True):
+        second.save()
+    assert not (media_root / name).exists(), (
+        'Убедитесь, что фото удаляется, когда на него больше не ссылаются.'
+    )
+    assert not any((media_root / variant).exists()
+                   for variant in variant_names(name))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert _files(media_root) == []
+
+
+@pytest.mark.django_db
+def test_image_released_only_after_commit(
+        media_root, blend_post_with_photo,
+        django_capture_on_commit_callbacks):
+    content = _photo_bytes()
+    post = blend_post_with_photo('a.jpg', content)
+    name = post.image.name
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.delete()
+    assert (media_root / name).exists(), (
+        'Убедитесь, что фото удаляется только после фиксации транзакции.'
+    )
+    # До фиксации то же фото загрузили снова: файл нужен новой публикации.
+    again = blend_post_with_photo('b.jpg', content)
+    assert again.image.name == name
+    for callback in callbacks:
+        callback()
+    assert (media_root / name).exists(), (
+        'Убедитесь, что ссылки на фото перепроверяются перед удалением.'
+    )
+
+
+@pytest.mark.django_db
+def test_media_served_immutable(media_root, blend_post_with_photo):
+    post = blend_post_with_photo('a.jpg', _photo_bytes())
+    (media_root / 'legacy.jpg').write_bytes(b'legacy')
+    request = RequestFactory().get('/')
+    response = serve_media(request, post.image.name, str(media_root))
+    assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL, (
+        'Убедитесь, что фото по хэшу отдаются с заголовком immutable.'
+    )
+    thumb = variant_names(post.image.name)[0]
+    response = serve_media(request, thumb, str(media_root))
+    assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    response = serve_media(request, 'legacy.jpg', str(media_root))
+    assert 'Cache-Control' not in response
+
+
+@pytest.mark.django_db
+def test_media_routed_without_debug(
+        client, media_root, blend_post_with_photo):
+    post = blend_post_with_photo('a.jpg', _photo_bytes())
+    response = client.get(f'/{post.image.name}')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что медиафайлы отдаются и при DEBUG = False.'
+    )
+    assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert client.get('/post_images/missing.jpg').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.django_db
+def test_legacy_image_variants_keep_derived_names(
+        media_root, blend_post_with_photo):
+    post = blend_post_with_photo('a.jpg', _photo_bytes())
+    (media_root / 'post_images' / 'legacy.jpg').write_bytes(
+        _photo_bytes('green')
+    )
+    Post.objects.filter(pk=post.pk).update(image='post_images/legacy.jpg')
+    call_command('generate_image_variants', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.has_image_variants
+    assert all((media_root / variant).exists()
+               for variant in variant_names('post_images/legacy.jpg')), (
+        'Убедитесь, что копии фото со старым именем называются'
+        ' от имени оригинала, а не хэшем.'
+    )
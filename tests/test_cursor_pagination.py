@@ -0,0 +1,127 @@
+import base64
+import json
+import re
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+import pytz
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+N_POSTS = N_PER_PAGE * 2 + 5
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    # Часть публикаций получает одинаковую дату,
+    # чтобы проверить разрешение «ничьих» по id.
+    same_date = datetime.now(tz=pytz.UTC) - timedelta(days=1)
+    dates = [
+        same_date if i % 3 == 0 else same_date - timedelta(hours=i)
+        for i in range(N_POSTS)
+    ]
+    return mixer.cycle(N_POSTS).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=(d for d in dates),
+    )
+
+
+def _cursor_urls(content, name):
+    return re.findall(rf'href="(\?{name}=[\w-]+)"', content)
+
+
+def _walk(client, url, key):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Убедитесь, что страница `{url}` в режиме курсора'
+            ' загружается без ошибок.'
+        )
+        pages.append(list(response.context['page_obj']))
+        next_urls = _cursor_urls(response.content.decode('utf-8'), key)
+        url = (url.split('?')[0] + next_urls[0]) if next_urls else None
+    return pages
+
+
+def _expected_order(posts):
+    return sorted(posts, key=lambda p: (p.pub_date, p.id), reverse=True)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_cursor_pagination_walks_all_posts(
+        client, many_posts, published_category, user, url_name):
+    base_url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    pages = _walk(client, base_url + '?after=', 'after')
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5], (
+        'Убедитесь, что в режиме курсора страницы содержат'
+        f' по {N_PER_PAGE} публикаций.'
+    )
+    walked = [post.id for page in pages for post in page]
+    expected = [post.id for post in _expected_order(many_posts)]
+    assert walked == expected, (
+        'Убедитесь, что при выводе по курсору публикации не дублируются,'
+        ' не пропадают и отсортированы по дате публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_before_returns_previous_page(client, many_posts):
+    first = client.get('/?after=')
+    second_url = _cursor_urls(first.content.decode('utf-8'), 'after')[0]
+    second = client.get('/' + second_url)
+    before_url = _cursor_urls(second.content.decode('utf-8'), 'before')[0]
+    back = client.get('/' + before_url)
+    assert (
+        [p.id for p in back.context['page_obj']]
+        == [p.id for p in first.context['page_obj']]
+    ), 'Убедитесь, что ссылка `?before=` возвращает предыдущую страницу.'
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_invalid_cursor(client, many_posts):
+    response = client.get('/?after=not-a-cursor')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что при некорректном курсоре возвращается статус 404.'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('values', [
+    [None, None],
+    ['2020-01-01T00:00:00+00:00', None],
+    ['', 1],
+])
+def test_cursor_pagination_empty_cursor_values(client, many_posts, values):
+    token = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+    response = client.get('/', {'after': token})
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что курсор с пустыми значениями ключа считается'
+        ' некорректным.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGINATION_MODE='cursor')
+def test_cursor_mode_setting_keeps_numbered_fallback(
+        client, many_posts):
+    response = client.get('/')
+    assert getattr(response.context['paginator'], 'is_cursor', False), (
+        'Убедитесь, что настройка `BLOG_PAGINATION_MODE = "cursor"`'
+        ' включает вывод по курсору.'
+    )
+    assert 'page=' not in response.content.decode('utf-8')
+    response = client.get('/?page=2')
+    assert response.context['page_obj'].number == 2, (
+        'Убедитесь, что запрос с `?page=` обслуживается'
+        ' нумерованным пагинатором.'
+    )
@@ -0,0 +1,84 @@
+import csv
+import gzip
+import json
+import tracemalloc
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    return mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.mark.django_db
+def test_export_posts_jsonl(posts, published_category, user):
+    out = StringIO()
+    call_command('exportblog', 'posts', chunk_size=1, stdout=out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row['id'] for row in rows] == [post.id for post in posts], (
+        'Убедитесь, что exportblog выгружает каждую публикацию'
+        ' отдельной строкой JSON.'
+    )
+    assert rows[0]['author__username'] == user.username
+    assert rows[0]['category__slug'] == published_category.slug
+    assert rows[0]['title'] == posts[0].title
+
+
+@pytest.mark.django_db
+def test_export_comments_csv_gzip_since(posts, mixer, user, tmp_path):
+    old, new = mixer.cycle(2).blend(
+        'blog.Comment', post=posts[0], author=user
+    )
+    Comment.objects.filter(pk=old.pk).update(
+        create_at=timezone.now() - timedelta(days=30)
+    )
+    path = tmp_path / 'comments.csv.gz'
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+    out = StringIO()
+    call_command(
+        'exportblog', 'comments', output=str(path), since=since, stdout=out
+    )
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as fh:
+        rows = list(csv.DictReader(fh))
+    assert [int(row['id']) for row in rows] == [new.id], (
+        'Убедитесь, что --since выгружает только новые записи,'
+        ' а выгрузка в .csv.gz сжимается.'
+    )
+    assert rows[0]['text'] == new.text
+    assert 'Выгружено записей: 1' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_export_memory_is_flat(user, tmp_path):
+    text = 'ё' * 2000
+    Post.objects.bulk_create(
+        Post(title=f'Пост {index}', text=text, author=user,
+             pub_date=timezone.now())
+        for index in range(400)
+    )
+    path = tmp_path / 'posts.jsonl'
+    tracemalloc.start()
+    try:
+        call_command(
+            'exportblog', 'posts', output=str(path), chunk_size=20,
+            stdout=StringIO(),
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert path.stat().st_size > 2 * 400 * len(text)
+    assert peak < path.stat().st_size / 4, (
+        'Убедитесь, что выгрузка читает строки порциями,'
+        ' а не загружает всю таблицу в память.'
+    )
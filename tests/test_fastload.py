@@ -0,0 +1,132 @@
+import io
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import CommandError, call_command
+from django.db import connections
+
+from blog.management.commands.fastload import iter_json_array
+from blog.models import Post
+from blog.search import get_backend
+from blog.text_analysis import analyze
+
+DB_JSON = Path(__file__).resolve().parent.parent / 'blogicum' / 'db.json'
+OTHER = 'fastload_other'
+
+
+def _count(model):
+    return sum(
+        record['model'] == model
+        for record in json.loads(DB_JSON.read_text(encoding='utf-8'))
+    )
+
+
+@pytest.mark.parametrize('read_size', [1, 7, 64 * 1024])
+def test_iter_json_array_reads_in_chunks(read_size):
+    records = [{'pk': index, 'text': 'ё' * index} for index in range(5)]
+    fh = io.StringIO(json.dumps(records, indent=2))
+    assert list(iter_json_array(fh, read_size)) == records
+
+
+@pytest.mark.parametrize('content', ['{"pk": 1}', '[{"pk": 1}, {"pk"'])
+def test_iter_json_array_rejects_broken_input(content):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(content), read_size=4))
+
+
+@pytest.mark.django_db
+def test_fastload_loads_db_json(client):
+    out = StringIO()
+    call_command('fastload', str(DB_JSON), batch_size=7, stdout=out)
+    output = out.getvalue()
+    assert Post.objects.count() == _count('blog.post'), (
+        'Убедитесь, что fastload загружает все публикации из фикстуры.'
+    )
+    assert f'blog.post: {_count("blog.post")}' in output
+    assert 'Загружено объектов' in output and 'в секунду' in output, (
+        'Убедитесь, что fastload сообщает скорость загрузки.'
+    )
+    assert not Post.objects.filter(is_scheduled=True).exists()
+    response = client.get('/search/', {'q': 'обед'})
+    assert Post.objects.get(pk=1) in response.context['page_obj'], (
+        'Убедитесь, что после fastload публикации попадают в поиск.'
+    )
+
+    Post.objects.filter(pk=1).update(title='Изменено')
+    call_command('fastload', str(DB_JSON), stdout=StringIO())
+    assert Post.objects.count() == _count('blog.post'), (
+        'Убедитесь, что повторная загрузка не создаёт дубликатов.'
+    )
+    assert Post.objects.get(pk=1).title == 'Обед'
+    post = Post.objects.create(
+        title='Новая', text='текст', pub_date=Post.objects.get(pk=1).pub_date,
+        author=Post.objects.get(pk=1).author,
+    )
+    assert post.pk > max(Post.objects.exclude(pk=post.pk).values_list(
+        'pk', flat=True
+    )), 'Убедитесь, что после загрузки сбрасываются счётчики ключей.'
+
+
+@pytest.mark.django_db
+def test_fastload_many_to_many_and_broken_links(tmp_path):
+    group = Group.objects.create(name='Авторы')
+    fixture = tmp_path / 'users.json'
+    fixture.write_text(json.dumps([{
+        'model': 'auth.user', 'pk': 100,
+        'fields': {'username': 'loaded', 'password': '', 'groups': [
+            group.pk
+        ]},
+    }]), encoding='utf-8')
+    call_command('fastload', str(fixture), stdout=StringIO())
+    assert list(get_user_model().objects.get(pk=100).groups.all()) == [
+        group
+    ]
+
+    fixture.write_text(json.dumps([{
+        'model': 'blog.post', 'pk': 1,
+        'fields': {'title': 'Без автора', 'text': '', 'author': 404,
+                   'pub_date': '2022-01-01T00:00:00Z'},
+    }]), encoding='utf-8')
+    with pytest.raises(CommandError):
+        call_command('fastload', str(fixture), stdout=StringIO())
+    assert not Post.objects.exists(), (
+        'Убедитесь, что при битых ссылках загрузка откатывается целиком.'
+    )
+
+
+@pytest.fixture
+def other_database(tmp_path, django_db_blocker, settings):
+    # Маршрутизатор реплик отправляет любую запись в default.
+    settings.DATABASE_ROUTERS = []
+    connections.settings[OTHER] = {
+        **connections.settings['default'],
+        'NAME': str(tmp_path / 'other.sqlite3'),
+    }
+    with django_db_blocker.unblock():
+        call_command('migrate', database=OTHER, verbosity=0)
+        yield OTHER
+    connections[OTHER].close()
+    del connections[OTHER]
+    del connections.settings[OTHER]
+
+
+@pytest.mark.django_db
+def test_fastload_other_database(other_database):
+    call_command(
+        'fastload', str(DB_JSON), database=other_database, stdout=StringIO()
+    )
+    posts = Post.objects.using(other_database)
+    assert posts.count() == _count('blog.post')
+    assert not Post.objects.exists(), (
+        'Убедитесь, что fastload пишет только в базу из --database.'
+    )
+    assert not posts.filter(is_scheduled=True).exists()
+    found = get_backend(other_database).search(posts, analyze('обед'))
+    assert 1 in found.values_list('pk', flat=True), (
+        'Убедитесь, что поисковый индекс перестраивается в базе'
+        ' из --database.'
+    )
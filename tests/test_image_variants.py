@@ -0,0 +1,112 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import VARIANT_WIDTHS, variant_names
+from blog.models import Job
+
+
+def _upload(name='photo.png', size=(2000, 1500), mode='RGBA'):
+    data = BytesIO()
+    Image.new(mode, size, (200, 100, 50, 128)[:len(mode)]).save(data, 'PNG')
+    return SimpleUploadedFile(name, data.getvalue(), content_type='image/png')
+
+
+@pytest.fixture
+def post_with_image(media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = _upload()
+    post.save()
+    post.refresh_from_db()
+    return post
+
+
+@pytest.mark.django_db
+def test_variants_generated_on_upload(media_root, post_with_image):
+    post = post_with_image
+    assert post.has_image_variants
+    job = Job.objects.get(kwargs__image_name=post.image.name)
+    assert job.status == Job.DONE, (
+        'Убедитесь, что копии фото создаёт фоновая задача.'
+    )
+    for name in variant_names(post.image.name):
+        path = media_root / name
+        assert path.parent == (media_root / post.image.name).parent
+        with Image.open(path) as image:
+            variant = name.rsplit('.', 2)[1]
+            assert image.width == VARIANT_WIDTHS[variant], (
+                'Убедитесь, что копии фото уменьшены до ширины варианта.'
+            )
+            assert image.format == (
+                'WEBP' if name.endswith('.webp') else 'JPEG'
+            )
+    assert post.image_thumb_webp_url.endswith('.thumb.webp')
+
+
+@pytest.mark.django_db
+def test_templates_use_srcset(user_client, post_with_image):
+    post = post_with_image
+    for url, default in (
+        ('/', post.image_thumb_url),
+        (f'/posts/{post.id}/', post.image_medium_url),
+    ):
+        content = user_client.get(url).content.decode()
+        assert f'{post.image_thumb_webp_url} 640w' in content, (
+            'Убедитесь, что шаблоны предлагают браузеру WebP-копии фото.'
+        )
+        assert f'{post.image_medium_url} 1280w' in content
+        assert f'src="{default}"' in content
+        assert f'src="{post.image.url}"' not in content, (
+            'Убедитесь, что в карточках не загружается оригинал фото.'
+        )
+
+
+@pytest.mark.django_db
+def test_variants_follow_image_changes(
+        media_root, post_with_image, django_capture_on_commit_callbacks):
+    post = post_with_image
+    old_variants = variant_names(post.image.name)
+    post.image = _upload('second.png', (300, 200), 'RGB')
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert not any((media_root / name).exists() for name in old_variants), (
+        'Убедитесь, что копии прежнего фото удаляются.'
+    )
+    new_variants = variant_names(post.image.name)
+    assert all((media_root / name).exists() for name in new_variants)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not any((media_root / name).exists() for name in new_variants)
+
+
+@pytest.mark.django_db
+def test_broken_image_falls_back_to_original(
+        media_root, client, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.image = SimpleUploadedFile('broken.jpg', b'not an image')
+    post.save()
+    post.refresh_from_db()
+    assert not post.has_image_variants
+    content = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert f'src="{post.image.url}"' in content
+    assert f'src="{post.image.url}"' in client.get(
+        f'/posts/{post.id}/'
+    ).content.decode()
+
+    (media_root / post.image.name).write_bytes(
+        _upload().read()
+    )
+    out = StringIO()
+    call_command('generate_image_variants', stdout=out)
+    assert 'Обработано фото: 1' in out.getvalue()
+    post.refresh_from_db()
+    assert post.has_image_variants
+    assert post.image_medium_url in client.get(
+        f'/posts/{post.id}/'
+    ).content.decode(), (
+        'Убедитесь, что generate_image_variants сбрасывает кэш страниц'
+        ' публикации.'
+    )
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.jobs import claim_job, enqueue, run_pending, task
+from blog.models import Job
+
+calls = []
+
+
+@task('tests.add')
+def add(a, b):
+    calls.append((a, b))
+    return a + b
+
+
+@task('tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('сбой')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+@pytest.mark.django_db
+def test_job_runs_and_stores_result():
+    job = enqueue('tests.add', {'a': 2, 'b': 3})
+    assert job.status == Job.PENDING
+    assert run_pending(concurrency=1) == (1, 0)
+    job.refresh_from_db()
+    assert job.status == Job.DONE and job.result == 5, (
+        'Убедитесь, что результат задачи сохраняется в очереди.'
+    )
+    assert job.attempts == 1 and job.finished_at and not job.locked_by
+    assert run_pending(concurrency=1) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_idempotency_key_enqueues_once():
+    first = enqueue('tests.add', {'a': 1, 'b': 1}, idempotency_key='k')
+    second = enqueue('tests.add', {'a': 5, 'b': 5}, idempotency_key='k')
+    assert first.pk == second.pk
+    assert Job.objects.count() == 1, (
+        'Убедитесь, что задача с тем же ключом не ставится повторно.'
+    )
+    run_pending(concurrency=1)
+    assert calls == [(1, 1)]
+
+
+@pytest.mark.django_db
+def test_delayed_job_waits():
+    enqueue('tests.add', {'a': 1, 'b': 2}, delay=timedelta(minutes=5))
+    assert run_pending(concurrency=1) == (0, 0), (
+        'Убедитесь, что отложенная задача не выполняется раньше срока.'
+    )
+
+
+@pytest.mark.django_db
+def test_failed_job_retries_with_backoff():
+    job = enqueue('tests.fail')
+    with override_settings(JOBS_RETRY_DELAY=60):
+        assert run_pending(concurrency=1) == (0, 1)
+    job.refresh_from_db()
+    assert job.status == Job.PENDING and job.attempts == 1
+    assert 'RuntimeError: сбой' in job.last_error
+    assert job.next_attempt_at > timezone.now() + timedelta(seconds=50), (
+        'Убедитесь, что упавшая задача повторяется после паузы.'
+    )
+    assert run_pending(concurrency=1) == (0, 0)
+
+    Job.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+    assert run_pending(concurrency=1) == (0, 1)
+    job.refresh_from_db()
+    assert job.status == Job.FAILED and job.attempts == 2, (
+        'Убедитесь, что после max_attempts попыток задача помечается'
+        ' как неудавшаяся.'
+    )
+
+
+@pytest.mark.django_db
+def test_stale_job_is_reclaimed():
+    job = enqueue('tests.add', {'a': 2, 'b': 2})
+    assert claim_job(job.pk, 'dead-worker')
+    assert run_pending(concurrency=1) == (0, 0)
+    Job.objects.filter(pk=job.pk).update(
+        locked_at=timezone.now() - timedelta(hours=1)
+    )
+    assert run_pending(concurrency=1) == (1, 0), (
+        'Убедитесь, что задача зависшего обработчика возвращается в очередь.'
+    )
+    job.refresh_from_db()
+    assert job.attempts == 2 and job.result == 4
+
+
+@pytest.mark.django_db
+def test_unknown_task_is_rejected():
+    with pytest.raises(LookupError):
+        enqueue('tests.missing')
+
+
+@pytest.mark.django_db
+@override_settings(JOBS_EAGER=True)
+def test_eager_mode_runs_immediately():
+    job = enqueue('tests.add', {'a': 4, 'b': 4})
+    assert job.status == Job.DONE and job.result == 8
+
+
+@pytest.mark.django_db
+def test_runworker_command():
+    enqueue('tests.add', {'a': 1, 'b': 2})
+    enqueue('tests.fail')
+    out = StringIO()
+    with override_settings(JOBS_RETRY_DELAY=0):
+        call_command('runworker', concurrency=1, stdout=out)
+    assert 'Выполнено: 1, с ошибкой: 2' in out.getvalue()
+    assert Job.objects.filter(status=Job.FAILED).count() == 1
@@ -0,0 +1,113 @@
+import json
+import os
+import re
+from http import HTTPStatus
+
+import pytest
+from django.test import Client, override_settings
+
+from blog.metrics import MetricsStore, render, store
+
+
+def _sample(text, name, **labels):
+    """Значение строки метрики с заданными метками или None."""
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if not match or match[1] != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match[2] or ''))
+        if found == {key: str(value) for key, value in labels.items()}:
+            return float(match[3])
+    return None
+
+
+@pytest.fixture(autouse=True)
+def reset_store():
+    store.reset()
+    yield
+    store.reset()
+
+
+@pytest.mark.django_db
+def test_metrics_labelled_by_route(post_with_published_location):
+    client = Client()
+    for _ in range(2):
+        client.get('/')
+    client.get(f'/posts/{post_with_published_location.id}/')
+    client.get('/posts/0/')
+
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.content.decode()
+    assert _sample(
+        text, 'http_requests_total',
+        method='GET', route='blog:index', status=200,
+    ) == 2, 'Убедитесь, что запросы считаются по имени маршрута.'
+    assert _sample(
+        text, 'http_requests_total',
+        method='GET', route='blog:post_detail', status=404,
+    ) == 1, 'Убедитесь, что счётчик запросов учитывает код ответа.'
+    assert _sample(
+        text, 'http_request_duration_seconds_count',
+        method='GET', route='blog:index',
+    ) == 2
+    assert _sample(
+        text, 'http_request_duration_seconds_bucket',
+        le='+Inf', method='GET', route='blog:index',
+    ) == 2
+    assert _sample(text, 'db_queries_total', route='blog:index') >= 1, (
+        'Убедитесь, что считаются SQL-запросы маршрута.'
+    )
+    assert _sample(
+        text, 'http_requests_in_flight', route='metrics'
+    ) == 1, 'Убедитесь, что учитываются запросы в обработке.'
+    assert _sample(
+        text, 'http_requests_in_flight', route='blog:index'
+    ) == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsStore(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+        metrics.observe('latency', {'route': 'r'}, value)
+    text = render([metrics.dump()])
+    assert '# TYPE latency histogram' in text
+    assert _sample(text, 'latency_bucket', le=0.1, route='r') == 1
+    assert _sample(text, 'latency_bucket', le=1.0, route='r') == 2
+    assert _sample(text, 'latency_bucket', le='+Inf', route='r') == 3
+    assert _sample(text, 'latency_sum', route='r') == pytest.approx(5.55)
+
+
+@pytest.mark.django_db
+def test_metrics_aggregate_process_files(tmp_path):
+    dead = MetricsStore()
+    dead.inc('http_requests_total', {'route': 'blog:index'}, 5)
+    dead.add_gauge('http_requests_in_flight', {'route': 'blog:index'}, 3)
+    dump = dead.dump()
+    # Номер процесса, которого заведомо нет.
+    dump['pid'] = 2 ** 22 + 1
+    (tmp_path / f'metrics_{dump["pid"]}.json').write_text(json.dumps(dump))
+
+    with override_settings(BLOG_METRICS_DIR=str(tmp_path)):
+        client = Client()
+        client.get('/')
+        text = client.get('/metrics').content.decode()
+
+    assert (tmp_path / f'metrics_{os.getpid()}.json').exists(), (
+        'Убедитесь, что процесс сохраняет метрики в BLOG_METRICS_DIR.'
+    )
+    assert _sample(
+        text, 'http_requests_total',
+        method='GET', route='blog:index', status=200,
+    ) == 1
+    assert _sample(
+        text, 'http_requests_total', route='blog:index'
+    ) == 5, 'Убедитесь, что счётчики всех процессов суммируются.'
+    assert _sample(
+        text, 'http_requests_in_flight', route='blog:index'
+    ) in (None, 0), (
+        'Убедитесь, что gauge-метрики завершённых процессов не учитываются.'
+    )
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import OutgoingEmail, Post
+from blog.outbox import claim_email, deliver_pending, enqueue_email
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class BrokenBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP не отвечает')
+
+
+def _post_data(category, **extra):
+    data = {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2020-01-01',
+        'category': category.id,
+    }
+    data.update(extra)
+    return data
+
+
+@pytest.mark.django_db
+def test_post_form_enqueues_once_after_save(user_client, published_category):
+    user_client.post(
+        '/posts/create/', data=_post_data(published_category, title='')
+    )
+    assert not OutgoingEmail.objects.exists(), (
+        'Убедитесь, что при ошибке валидации формы публикации'
+        ' письмо не ставится в очередь.'
+    )
+    user_client.post('/posts/create/', data=_post_data(published_category))
+    post = Post.objects.get()
+    user_client.post(
+        f'/posts/{post.id}/edit/',
+        data=_post_data(published_category, title='Новый заголовок'),
+    )
+    assert OutgoingEmail.objects.count() == 1, (
+        'Убедитесь, что одна публикация порождает ровно одно уведомление.'
+    )
+    assert len(mail.outbox) == 0, (
+        'Убедитесь, что письмо не отправляется во время обработки запроса.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_BACKEND=f'{__name__}.CountingBackend')
+def test_deliver_pending_reuses_one_connection():
+    for i in range(3):
+        enqueue_email(f'key-{i}', f'Тема {i}', 'Текст', ['to@example.com'])
+    CountingBackend.opened = 0
+    call_command('send_queued_mail', batch_size=10)
+    assert len(mail.outbox) == 3
+    assert CountingBackend.opened == 1, (
+        'Убедитесь, что пачка писем отправляется через одно соединение.'
+    )
+    assert not OutgoingEmail.objects.exclude(
+        status=OutgoingEmail.SENT).exists()
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND=f'{__name__}.BrokenBackend',
+    OUTBOX_RETRY_DELAY=10,
+    OUTBOX_MAX_ATTEMPTS=2,
+)
+def test_deliver_pending_retries_with_backoff():
+    email, _ = enqueue_email('key', 'Тема', 'Текст', ['to@example.com'])
+    assert deliver_pending() == (0, 1)
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.PENDING
+    assert email.attempts == 1
+    assert email.next_attempt_at > timezone.now() + timedelta(seconds=5), (
+        'Убедитесь, что после ошибки отправка откладывается.'
+    )
+    assert deliver_pending() == (0, 0)
+
+    OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+    deliver_pending()
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.FAILED, (
+        'Убедитесь, что после исчерпания попыток письмо помечается'
+        ' как неотправленное.'
+    )
+    assert 'SMTP' in email.last_error
+
+
+@pytest.mark.django_db
+def test_enqueue_email_dedupes():
+    _, created = enqueue_email('same', 'Тема', 'Текст', ['to@example.com'])
+    _, created_again = enqueue_email(
+        'same', 'Другая тема', 'Текст', ['to@example.com'])
+    assert created and not created_again
+    assert OutgoingEmail.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_deliver_pending_claims_before_sending():
+    enqueue_email('key', 'Тема', 'Текст', ['to@example.com'])
+    first, second = (
+        OutgoingEmail.objects.get(), OutgoingEmail.objects.get()
+    )
+    assert claim_email(first)
+    assert not claim_email(second), (
+        'Убедитесь, что письмо, забранное одним обработчиком,'
+        ' не отправляется другим.'
+    )
+    assert deliver_pending() == (0, 0)
+    assert len(mail.outbox) == 0
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND=f'{__name__}.UnreachableBackend',
+    OUTBOX_RETRY_DELAY=10,
+    OUTBOX_MAX_ATTEMPTS=2,
+)
+def test_deliver_pending_counts_connection_failure():
+    for i in range(2):
+        enqueue_email(f'key-{i}', 'Тема', 'Текст', ['to@example.com'])
+    assert deliver_pending() == (0, 2), (
+        'Убедитесь, что ошибка соединения с почтовым сервером считается'
+        ' неудачной попыткой для всех взятых писем.'
+    )
+    for email in OutgoingEmail.objects.all():
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=5)
+
+    OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+    call_command('send_queued_mail')
+    assert not OutgoingEmail.objects.exclude(
+        status=OutgoingEmail.FAILED
+    ).exists(), 'Убедитесь, что число попыток ограничено и без соединения.'
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from multiprocessing import get_context
+
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+
+from blog.cache import feed_tag
+
+
+def _is_cached(response):
+    # Ответ из кэша страниц не проходит через шаблоны.
+    return not response.templates
+
+
+@pytest.fixture
+def detail_url(post_with_published_location):
+    return f'/posts/{post_with_published_location.id}/'
+
+
+@pytest.fixture
+def category_url(post_with_published_location):
+    return f'/category/{post_with_published_location.category.slug}/'
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_served_from_cache(
+        client, detail_url, category_url, django_assert_max_num_queries):
+    for url in ('/', detail_url, category_url):
+        first = client.get(url)
+        assert not _is_cached(first)
+        with django_assert_max_num_queries(1):
+            second = client.get(url)
+        assert _is_cached(second), (
+            f'Убедитесь, что страница `{url}` для анонимного читателя'
+            ' отдаётся из кэша.'
+        )
+        assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_authenticated_users_bypass_cache(user_client, detail_url):
+    user_client.get(detail_url)
+    assert not _is_cached(user_client.get(detail_url)), (
+        'Убедитесь, что авторизованные пользователи не получают'
+        ' страницы из кэша.'
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_varies_on_page_and_cursor(
+        client, many_posts_with_published_locations):
+    first = client.get('/')
+    second = client.get('/?page=2')
+    cursor = client.get('/?after=')
+    assert not _is_cached(second) and not _is_cached(cursor)
+    assert first.content != second.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('change', ['post', 'category', 'location', 'comment'])
+def test_page_cache_purged_on_change(
+        client, mixer, post_with_published_location, detail_url,
+        category_url, change):
+    post = post_with_published_location
+    for url in ('/', detail_url, category_url):
+        client.get(url)
+    if change == 'post':
+        post.title = 'Изменённый заголовок'
+        post.save()
+    elif change == 'category':
+        post.category.title = 'Изменённая категория'
+        post.category.save()
+    elif change == 'location':
+        post.location.name = 'Изменённое место'
+        post.location.save()
+    else:
+        mixer.blend('blog.Comment', post=post)
+    for url in ('/', detail_url, category_url):
+        assert not _is_cached(client.get(url)), (
+            f'Убедитесь, что изменение ({change}) сбрасывает'
+            f' кэш страницы `{url}`.'
+        )
+
+
+@pytest.mark.django_db
+def test_page_cache_purge_is_precise(
+        client, mixer, post_with_published_location,
+        post_with_another_category, detail_url):
+    other_url = f'/posts/{post_with_another_category.id}/'
+    other_category_url = (
+        f'/category/{post_with_another_category.category.slug}/'
+    )
+    for url in (other_url, other_category_url):
+        client.get(url)
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    for url in (other_url, other_category_url):
+        assert _is_cached(client.get(url)), (
+            'Убедитесь, что изменения одной публикации не сбрасывают'
+            f' кэш не связанной с ней страницы `{url}`.'
+        )
+
+
+def _invalidate_in_other_process(location, tag):
+    import django
+    from django.conf import settings
+
+    settings.CACHES['default']['LOCATION'] = location
+    django.setup()
+    from blog.cache import invalidate_tags
+
+    invalidate_tags(tag)
+
+
+@pytest.mark.django_db
+def test_page_cache_purged_from_other_process(
+        client, cache_dir, post_with_published_location):
+    client.get('/')
+    assert _is_cached(client.get('/'))
+    with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+        pool.submit(
+            _invalidate_in_other_process, cache_dir, feed_tag()
+        ).result()
+    assert not _is_cached(client.get('/')), (
+        'Убедитесь, что кэш общий для процессов: сброс тега в команде'
+        ' или другом процессе виден веб-процессам.'
+    )
+
+
+def _announce_in_other_process(location, post_pk, category_slug):
+    # База тестов недоступна другому процессу, поэтому публикация
+    # объявляется так же, как в announce_visible_posts, но без запросов.
+    import django
+    from django.conf import settings
+
+    settings.CACHES['default']['LOCATION'] = location
+    django.setup()
+    from blog.models import Category, Post
+    from blog.visibility import (
+        forget_next_visibility_change,
+        post_became_visible,
+    )
+
+    forget_next_visibility_change()
+    post = Post(pk=post_pk, category=Category(slug=category_slug))
+    post_became_visible.send(sender=Post, post=post)
+
+
+@pytest.mark.django_db
+def test_scheduled_publication_purged_from_other_process(
+        client, cache_dir, mixer, user, published_category):
+    # Модели импортируются здесь: модуль загружается и в другом
+    # процессе до django.setup().
+    from blog.models import Post
+    from blog.visibility import NEXT_CHANGE_KEY, next_visibility_change
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=2),
+    )
+    assert next_visibility_change() == post.pub_date
+    assert post.title not in client.get('/').content.decode()
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1), is_scheduled=False
+    )
+    with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+        pool.submit(
+            _announce_in_other_process, cache_dir,
+            post.pk, published_category.slug,
+        ).result()
+    assert caches['default'].get(NEXT_CHANGE_KEY) is None, (
+        'Убедитесь, что дата ближайшей смены видимости, сброшенная'
+        ' командой publish_scheduled, сбрасывается и у веб-процессов.'
+    )
+    assert post.title in client.get('/').content.decode(), (
+        'Убедитесь, что кэш ленты, сброшенный командой publish_scheduled'
+        ' в своём процессе, сбрасывается и у веб-процессов.'
+    )
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+CARD_TEMPLATE = 'includes/post_card.html'
+DB_JSON = Path(__file__).resolve().parent.parent / 'blogicum' / 'db.json'
+
+
+def _rendered_cards(response):
+    return [t.name for t in response.templates].count(CARD_TEMPLATE)
+
+
+@pytest.mark.django_db
+def test_post_cards_served_from_cache(
+        user_client, many_posts_with_published_locations):
+    first = user_client.get('/')
+    assert _rendered_cards(first) == 10
+    second = user_client.get('/')
+    assert _rendered_cards(second) == 0, (
+        'Убедитесь, что при повторном показе ленты карточки публикаций'
+        ' берутся из кэша фрагментов.'
+    )
+    assert first.content == second.content
+
+
+@pytest.mark.django_db
+def test_post_card_invalidated_by_related_changes(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что новый комментарий обновляет карточку публикации.'
+    )
+
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert 'Новое место' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что изменение местоположения обновляет карточку.'
+    )
+
+    post.category.title = 'Новая категория'
+    post.category.save()
+    assert 'Новая категория' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что изменение категории обновляет карточку.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert 'Новый заголовок' in client.get('/').content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_loaddata_fills_updated_at():
+    call_command('loaddata', str(DB_JSON), verbosity=0)
+    assert Post.objects.count() == 39
+    assert not Post.objects.filter(updated_at=None).exists(), (
+        'Убедитесь, что raw-сохранение при loaddata заполняет updated_at.'
+    )
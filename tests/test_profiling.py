@@ -0,0 +1,89 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from blog.profiling import fingerprint, percentile, registry
+
+
+@pytest.fixture
+def profiling(tmp_path):
+    registry.reset()
+    with override_settings(
+        BLOG_PROFILING=True,
+        BLOG_PROFILING_DIR=str(tmp_path),
+        BLOG_PROFILING_FLUSH_INTERVAL=0,
+    ):
+        yield tmp_path
+    registry.reset()
+
+
+@pytest.fixture
+def staff_client(mixer):
+    client = Client()
+    client.force_login(mixer.blend('auth.User', is_staff=True))
+    return client
+
+
+def test_fingerprint_normalizes_values():
+    assert fingerprint(
+        "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a''b'"
+    ) == fingerprint('SELECT *  FROM t WHERE id IN (%s) AND name = %s')
+    assert percentile([5, 1, 4, 2, 3], 0.5) == 3
+    assert percentile([], 0.5) is None
+
+
+@pytest.mark.django_db
+def test_profiling_aggregates_by_view_name(
+        profiling, staff_client, post_with_published_location):
+    client = Client()
+    for _ in range(3):
+        client.get('/')
+    client.get(f'/posts/{post_with_published_location.id}/')
+
+    response = staff_client.get('/admin/profiling/')
+    assert response.status_code == HTTPStatus.OK
+    report = response.json()
+    index = report['blog:index']
+    assert index['duration']['count'] == 3, (
+        'Убедитесь, что статистика собирается по имени представления.'
+    )
+    assert index['queries']['max'] >= 1
+    assert index['slowest_statements'], report
+    assert any('blog_post' in s['fingerprint']
+               for s in index['slowest_statements'])
+    assert 'blog/index.html' in index['templates']
+    assert index['cache']['hits'] >= 1, (
+        'Убедитесь, что учитываются попадания в кэш страниц.'
+    )
+    assert 'blog:post_detail' in report
+
+
+@pytest.mark.django_db
+def test_profiling_report_requires_staff(profiling, user_client):
+    response = user_client.get('/admin/profiling/')
+    assert response.status_code != HTTPStatus.OK, (
+        'Убедитесь, что отчёт профилирования доступен только персоналу.'
+    )
+
+
+@pytest.mark.django_db
+def test_profiling_report_command(profiling):
+    Client().get('/')
+    assert list(profiling.glob('*.json'))
+    out = StringIO()
+    call_command('profiling_report', json=True, stdout=out)
+    assert json.loads(out.getvalue())['blog:index']['duration']['count'] == 1
+    out = StringIO()
+    call_command('profiling_report', stdout=out)
+    assert 'blog:index' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_profiling_disabled_by_default(client):
+    registry.reset()
+    client.get('/')
+    assert registry.snapshot() == {}
@@ -0,0 +1,78 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def _post_list_query(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        client.get(url)
+    selects = [
+        query['sql'] for query in captured.captured_queries
+        if re.match(r'SELECT .+ FROM "blog_post"', query['sql'])
+        and 'LIMIT' in query['sql']
+    ]
+    assert selects, f'Не найден запрос списка публикаций для `{url}`.'
+    return selects[-1]
+
+
+def _query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _full_scans(plan, table):
+    return [
+        step for step in plan
+        if re.fullmatch(rf'SCAN (TABLE )?{table}( AS \w+)?', step)
+    ]
+
+
+@pytest.fixture
+def list_urls(published_category, user):
+    return {
+        'blog:index': '/',
+        'blog:category_posts': f'/category/{published_category.slug}/',
+        'blog:profile': f'/profile/{user.username}/',
+    }
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Проверка планов для SQLite.'
+)
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'view_name', ['blog:index', 'blog:category_posts', 'blog:profile']
+)
+def test_list_views_use_post_index(
+        client, list_urls, view_name, many_posts_with_published_locations):
+    plan = _query_plan(_post_list_query(client, list_urls[view_name]))
+    assert not _full_scans(plan, 'blog_post'), (
+        f'Убедитесь, что запрос списка `{view_name}` использует индекс'
+        f' таблицы `blog_post`, а не полный просмотр таблицы: {plan}'
+    )
+    assert any('blog_post USING' in step for step in plan), plan
+    if view_name == 'blog:index':
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Убедитесь, что лента публикаций отсортирована по индексу'
+            f' без дополнительной сортировки: {plan}'
+        )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Проверка планов для SQLite.'
+)
+@pytest.mark.django_db
+def test_post_comments_use_comment_index(post_with_published_location):
+    queryset = post_with_published_location.comments.order_by('create_at')
+    plan = _query_plan(str(queryset.query))
+    assert not _full_scans(plan, 'blog_comment'), plan
+    assert any(
+        'comment_post_create_at_idx' in step for step in plan
+    ), (
+        'Убедитесь, что комментарии публикации выбираются по индексу'
+        f' `(post, create_at)` без дополнительной сортировки: {plan}'
+    )
+    assert not any('TEMP B-TREE' in step for step in plan), plan
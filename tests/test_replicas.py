@@ -0,0 +1,148 @@
+"""
+Чтение с реплик на двух файлах SQLite.
+
+Основная база — тестовая база pytest-django, реплики — файлы во временном
+каталоге. «Репликация» — копия основной базы через backup API SQLite:
+до вызова ``replicate`` реплика отстаёт от основной базы.
+"""
+from datetime import timedelta
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.routers import PIN_COOKIE, reset_health
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@pytest.fixture
+def replicas(tmp_path, settings):
+    for alias in REPLICAS:
+        connections.settings[alias] = {
+            **connections.settings['default'],
+            'NAME': str(tmp_path / f'{alias}.sqlite3'),
+        }
+    settings.BLOG_READ_REPLICAS = REPLICAS
+    reset_health()
+    yield REPLICAS
+    reset_health()
+    for alias in REPLICAS:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+def replicate(*aliases):
+    primary = connections['default']
+    primary.ensure_connection()
+    for alias in aliases or REPLICAS:
+        connections[alias].ensure_connection()
+        primary.connection.backup(connections[alias].connection)
+
+
+@pytest.fixture
+def published_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def _queries(aliases, func):
+    contexts = {alias: CaptureQueriesContext(connections[alias])
+                for alias in aliases}
+    for context in contexts.values():
+        context.__enter__()
+    try:
+        func()
+    finally:
+        for context in contexts.values():
+            context.__exit__(None, None, None)
+    # Проверки живости реплик (SELECT 1) не считаются.
+    return {
+        alias: sum(query['sql'] != 'SELECT 1' for query in context)
+        for alias, context in contexts.items()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_public_pages_read_from_replicas(
+        replicas, user_client, published_post):
+    replicate()
+    url = f'/posts/{published_post.id}/'
+    counts = [
+        _queries(['default', *replicas], lambda: user_client.get(url))
+        for _ in range(2)
+    ]
+    used = [
+        next(alias for alias in replicas if count[alias])
+        for count in counts
+    ]
+    assert sorted(used) == replicas, (
+        'Убедитесь, что запросы распределяются по репликам по кругу.'
+    )
+    assert all(
+        not all(count[alias] for alias in replicas) for count in counts
+    ), 'Убедитесь, что одна страница читает данные с одной реплики.'
+    assert user_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replica_lag_and_unhealthy_replica(
+        replicas, user_client, published_post, settings):
+    connections.settings['replica2']['NAME'] = '/nonexistent/replica.db'
+    replicate('replica1')
+    hidden = f'/posts/{published_post.id}/'
+    published_post.title = 'Обновлённый заголовок'
+    published_post.save()
+    for _ in range(3):
+        counts = _queries(['replica1'], lambda: user_client.get('/'))
+        assert counts['replica1'], (
+            'Убедитесь, что недоступная реплика пропускается.'
+        )
+    content = user_client.get(hidden).content.decode()
+    assert 'Обновлённый заголовок' not in content, (
+        'Убедитесь, что публичные страницы читаются с реплики.'
+    )
+
+    settings.BLOG_READ_REPLICAS = ['replica2']
+    reset_health()
+    assert 'Обновлённый заголовок' in (
+        user_client.get(hidden).content.decode()
+    ), 'Убедитесь, что без живых реплик чтение идёт в основную базу.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_pinned_to_primary_after_write(
+        replicas, user_client, published_post):
+    replicate()
+    url = f'/posts/{published_post.id}/'
+    response = user_client.post(
+        f'/posts/{published_post.id}/comment/', {'text': 'Свежий отзыв'}
+    )
+    assert PIN_COOKIE in response.cookies, (
+        'Убедитесь, что после записи пользователь закрепляется'
+        ' за основной базой.'
+    )
+    counts = _queries(replicas, lambda: user_client.get(url))
+    assert not any(counts.values())
+    assert 'Свежий отзыв' in user_client.get(url).content.decode(), (
+        'Убедитесь, что автор сразу видит свою запись.'
+    )
+
+    del user_client.cookies[PIN_COOKIE]
+    assert 'Свежий отзыв' not in user_client.get(url).content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_does_not_pin_to_primary(replicas, client, published_post):
+    replicate()
+    response = client.get('/search/', {'q': published_post.title})
+    assert response.status_code == 200
+    assert PIN_COOKIE not in response.cookies, (
+        'Убедитесь, что запросы без записи в базу не закрепляют'
+        ' пользователя за основной базой.'
+    )
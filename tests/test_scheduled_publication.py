@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.visibility import (
+    next_visibility_change,
+    post_became_visible,
+    visibility_timeout,
+)
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=2),
+    )
+
+
+@pytest.fixture
+def received():
+    posts = []
+
+    def receiver(sender, post, **kwargs):
+        posts.append(post)
+
+    post_became_visible.connect(receiver)
+    yield posts
+    post_became_visible.disconnect(receiver)
+
+
+def _pass_time(post):
+    # Имитирует наступление даты публикации без сохранения модели.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+
+
+@pytest.mark.django_db
+def test_next_visibility_change(mixer, user, scheduled_post):
+    assert scheduled_post.is_scheduled
+    assert next_visibility_change() == scheduled_post.pub_date
+    mixer.blend(
+        'blog.Post', author=user, is_published=False,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert next_visibility_change() == scheduled_post.pub_date, (
+        'Убедитесь, что снятые с публикации посты не влияют'
+        ' на дату ближайшей смены видимости.'
+    )
+    sooner = mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=30),
+    )
+    assert next_visibility_change() == sooner.pub_date
+    timeout = visibility_timeout(60 * 60 * 24)
+    assert 29 * 60 < timeout <= 30 * 60, (
+        'Убедитесь, что срок кэширования не переживает'
+        ' ближайшую отложенную публикацию.'
+    )
+
+
+@pytest.mark.django_db
+def test_no_scheduled_posts_keep_default_timeout(post_with_published_location):
+    assert next_visibility_change() is None
+    assert visibility_timeout(300) == 300
+
+
+@pytest.mark.django_db
+def test_publish_scheduled_fires_signal_once(
+        client, scheduled_post, received):
+    assert scheduled_post.title not in client.get('/').content.decode()
+    call_command('publish_scheduled')
+    assert received == [], 'Дата публикации ещё не наступила.'
+
+    _pass_time(scheduled_post)
+    call_command('publish_scheduled')
+    call_command('publish_scheduled')
+    assert [post.pk for post in received] == [scheduled_post.pk], (
+        'Убедитесь, что `post_became_visible` отправляется ровно один раз'
+        ' для каждой наступившей отложенной публикации.'
+    )
+    assert not Post.objects.get(pk=scheduled_post.pk).is_scheduled
+    assert scheduled_post.title in client.get('/').content.decode(), (
+        'Убедитесь, что после наступления даты публикации'
+        ' кэш ленты сбрасывается.'
+    )
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from http import HTTPStatus
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post, SearchTerm
+from blog.search import fts5_table_exists
+from blog.views import NUMBER_OF_RECORDS
+
+
+@pytest.fixture(params=['fts5', 'terms'])
+def backend(request, django_db_setup, django_db_blocker):
+    if request.param == 'fts5':
+        with django_db_blocker.unblock():
+            if not fts5_table_exists(connection):
+                pytest.skip('SQLite собран без FTS5.')
+    with override_settings(BLOG_SEARCH_BACKEND=request.param):
+        yield request.param
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category, published_location):
+    def blend(title, text, **kwargs):
+        params = dict(
+            author=user, category=published_category,
+            location=published_location, is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+        params.update(kwargs)
+        return mixer.blend('blog.Post', title=title, text=text, **params)
+    return blend
+
+
+def _found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == HTTPStatus.OK
+    return [post.id for post in response.context['page_obj']]
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(client, backend, blend_post):
+    in_text = blend_post('Прогулка', 'Видели в лесу ёжика и белку')
+    in_title = blend_post('Ёжика встретили', 'Рассказ о прогулке')
+    blend_post('Другое', 'Ничего общего')
+    assert _found(client, 'ежика') == [in_title.id, in_text.id], (
+        'Убедитесь, что совпадения в заголовке ранжируются выше,'
+        ' а «ё» и «е» не различаются.'
+    )
+    assert _found(client, 'ёжика белку') == [in_text.id], (
+        'Убедитесь, что в результатах только публикации со всеми словами.'
+    )
+    assert _found(client, '   ') == []
+    assert _found(client, 'прогулках') == [in_text.id, in_title.id], (
+        'Убедитесь, что поиск находит другие формы слова.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(
+        client, user_client, backend, blend_post, mixer):
+    visible = blend_post('Комета', 'текст')
+    blend_post('Комета', 'снята', is_published=False)
+    blend_post(
+        'Комета', 'отложена', pub_date=timezone.now() + timedelta(days=1)
+    )
+    blend_post(
+        'Комета', 'скрытая категория',
+        category=mixer.blend('blog.Category', is_published=False),
+    )
+    assert _found(client, 'комета') == [visible.id], (
+        'Убедитесь, что поиск выводит только опубликованные публикации,'
+        ' как и лента.'
+    )
+    assert _found(user_client, 'комета') == [visible.id]
+
+
+@pytest.mark.django_db
+def test_index_follows_post_changes(client, backend, blend_post):
+    post = blend_post('Старый заголовок', 'текст')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert _found(client, 'новый') == [post.id]
+    assert _found(client, 'старый') == [], (
+        'Убедитесь, что индекс обновляется при сохранении публикации.'
+    )
+    post.delete()
+    assert _found(client, 'новый') == []
+
+
+@pytest.mark.django_db
+def test_search_paginates_and_keeps_query(client, backend, blend_post):
+    for index in range(NUMBER_OF_RECORDS + 2):
+        blend_post(f'Метеор {index}', 'текст')
+    first = _found(client, 'метеор')
+    second = _found(client, 'метеор', page=2)
+    assert len(first) == NUMBER_OF_RECORDS and len(second) == 2
+    assert not set(first) & set(second)
+    response = client.get('/search/', {'q': 'метеор'})
+    assert 'q=%D0%BC%D0%B5%D1%82%D0%B5%D0%BE%D1%80&amp;page=2' in (
+        response.content.decode()
+    ), 'Убедитесь, что ссылки на страницы сохраняют поисковый запрос.'
+
+
+@pytest.mark.django_db
+def test_rebuild_command(client, backend, blend_post):
+    post = blend_post('Галактика', 'текст')
+    with connection.cursor() as cursor:
+        if backend == 'fts5':
+            cursor.execute('DELETE FROM blog_post_fts')
+        else:
+            SearchTerm.objects.all().delete()
+    assert _found(client, 'галактика') == []
+    out = StringIO()
+    call_command('rebuild_search_index', batch_size=1, stdout=out)
+    assert f'Проиндексировано публикаций: {Post.objects.count()}' in (
+        out.getvalue()
+    )
+    assert _found(client, 'галактика') == [post.id]
+
+
+@pytest.mark.django_db
+def test_migration_indexes_existing_posts(client, backend, blend_post):
+    post = blend_post('Туманность', 'текст')
+    with connection.cursor() as cursor:
+        if backend == 'fts5':
+            cursor.execute('DELETE FROM blog_post_fts')
+        else:
+            SearchTerm.objects.all().delete()
+    assert _found(client, 'туманность') == []
+    migration = import_module('blog.migrations.0021_index_existing_posts')
+    # Редактор схемы SQLite не открывается внутри транзакции теста.
+    schema_editor = SimpleNamespace(connection=connection)
+    migration.index_existing_posts(apps, schema_editor)
+    # Миграция кэш не трогает: до неё поиска не было и в кэше его нет.
+    caches['default'].clear()
+    assert _found(client, 'туманность') == [post.id], (
+        'Убедитесь, что миграция индексирует уже существующие публикации.'
+    )
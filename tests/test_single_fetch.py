@@ -0,0 +1,120 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+
+def _object_fetches(captured, table, pk):
+    pattern = re.compile(
+        rf'^SELECT .+ FROM "{table}" .*WHERE .*"{table}"\."id" = {pk}\b'
+    )
+    return [
+        query['sql'] for query in captured.captured_queries
+        if pattern.match(query['sql'])
+    ]
+
+
+def _request(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as captured:
+        response = getattr(client, method)(url, data=data or {})
+    return response, captured
+
+
+@pytest.fixture
+def own_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def own_comment(mixer, user, own_post):
+    return mixer.blend('blog.Comment', author=user, post=own_post)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('method', ['get', 'post'])
+@pytest.mark.parametrize('action', ['detail', 'edit', 'delete'])
+def test_post_views_fetch_post_once(user_client, own_post, action, method):
+    if action == 'detail' and method == 'post':
+        pytest.skip('Страница публикации принимает только GET.')
+    url = {
+        'detail': f'/posts/{own_post.id}/',
+        'edit': f'/posts/{own_post.id}/edit/',
+        'delete': f'/posts/{own_post.id}/delete/',
+    }[action]
+    data = {
+        'title': 'Заголовок', 'text': 'Текст', 'pub_date': '2020-01-01',
+        'category': own_post.category_id,
+    } if action == 'edit' else None
+    response, captured = _request(user_client, method, url, data)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND)
+    fetches = _object_fetches(captured, 'blog_post', own_post.id)
+    assert len(fetches) == 1, (
+        f'Убедитесь, что `{method.upper()} {url}` загружает публикацию'
+        f' ровно один раз, а не {len(fetches)}.'
+    )
+    assert 'auth_user' in fetches[0] and 'blog_category' in fetches[0], (
+        'Убедитесь, что публикация загружается вместе с автором'
+        ' и категорией.'
+    )
+    if action == 'delete' and method == 'post':
+        assert not Post.objects.filter(pk=own_post.pk).exists()
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_fetches_post_once(client, own_post):
+    url = f'/posts/{own_post.id}/'
+    for expected in (1, 0):
+        response, captured = _request(client, 'get', url)
+        assert response.status_code == HTTPStatus.OK
+        fetches = _object_fetches(captured, 'blog_post', own_post.id)
+        assert len(fetches) == expected, (
+            f'Убедитесь, что `GET {url}` для анонимного читателя загружает'
+            ' публикацию не больше одного раза и не читает её перед'
+            ' проверкой кэша.'
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('method', ['get', 'post'])
+@pytest.mark.parametrize('action', ['edit_comment', 'delete_comment'])
+def test_comment_views_fetch_comment_once(
+        user_client, own_comment, action, method):
+    url = f'/posts/{own_comment.post_id}/{action}/{own_comment.id}/'
+    data = {'text': 'Новый текст'} if action == 'edit_comment' else None
+    response, captured = _request(user_client, method, url, data)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND)
+    fetches = _object_fetches(captured, 'blog_comment', own_comment.id)
+    assert len(fetches) == 1, (
+        f'Убедитесь, что `{method.upper()} {url}` загружает комментарий'
+        f' ровно один раз, а не {len(fetches)}.'
+    )
+    if action == 'delete_comment' and method == 'post':
+        assert not Comment.objects.filter(pk=own_comment.pk).exists()
+
+
+@pytest.mark.django_db
+def test_foreign_post_and_comment_rejected_after_single_fetch(
+        another_user_client, own_post, own_comment):
+    response, captured = _request(
+        another_user_client, 'post', f'/posts/{own_post.id}/edit/'
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert len(_object_fetches(captured, 'blog_post', own_post.id)) == 1
+    response = another_user_client.post(f'/posts/{own_post.id}/delete/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    response, captured = _request(
+        another_user_client, 'post',
+        f'/posts/{own_post.id}/delete_comment/{own_comment.id}/',
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.filter(pk=own_comment.pk).exists()
@@ -0,0 +1,115 @@
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+WRITERS = 4
+READERS = 2
+INCREMENTS = 40
+
+
+def _connect(path):
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(
+            DATABASES={'default': {
+                'ENGINE': 'blog.backends.sqlite3',
+                'NAME': path,
+                'OPTIONS': {'pragmas': {'busy_timeout': 20000}},
+            }},
+            USE_TZ=True,
+        )
+        django.setup()
+    from django.db import connection
+    return connection
+
+
+def _writer(path):
+    from django.db import transaction
+    connection = _connect(path)
+    for _ in range(INCREMENTS):
+        # Чтение и запись в одной транзакции: без BEGIN IMMEDIATE
+        # одновременное повышение блокировки даёт «database is locked».
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SELECT value FROM counter')
+            value = cursor.fetchone()[0]
+            cursor.execute('UPDATE counter SET value = %s', [value + 1])
+            cursor.execute('INSERT INTO log (value) VALUES (%s)', [value])
+    return INCREMENTS
+
+
+def _reader(path):
+    connection = _connect(path)
+    reads = 0
+    deadline = time.monotonic() + 60
+    with connection.cursor() as cursor:
+        # Читает, пока писатели не закончат.
+        while time.monotonic() < deadline:
+            cursor.execute('SELECT COUNT(*), MAX(value) FROM log')
+            count, _ = cursor.fetchone()
+            reads += 1
+            if count == WRITERS * INCREMENTS:
+                break
+    return reads
+
+
+@pytest.mark.django_db
+def test_pragmas_applied_on_connect():
+    with connection.cursor() as cursor:
+        for pragma, expected in (
+            ('synchronous', 1),
+            ('temp_store', 2),
+            ('busy_timeout', 5000),
+            ('cache_size', -16000),
+        ):
+            cursor.execute(f'PRAGMA {pragma}')
+            assert cursor.fetchone()[0] == expected, (
+                f'Убедитесь, что при подключении выполняется PRAGMA {pragma}.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_begin_immediate():
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            connection.cursor().execute('SELECT 1')
+    assert queries[0]['sql'] == 'BEGIN IMMEDIATE', (
+        'Убедитесь, что транзакции открываются как BEGIN IMMEDIATE.'
+    )
+
+
+def test_concurrent_writers_and_readers(tmp_path):
+    path = str(tmp_path / 'concurrency.sqlite3')
+    with sqlite3.connect(path) as db:
+        db.execute('CREATE TABLE counter (value INTEGER NOT NULL)')
+        db.execute('INSERT INTO counter VALUES (0)')
+        db.execute(
+            'CREATE TABLE log (id INTEGER PRIMARY KEY, value INTEGER UNIQUE)'
+        )
+    db.close()
+
+    with ProcessPoolExecutor(
+        max_workers=WRITERS + READERS, mp_context=get_context('spawn')
+    ) as pool:
+        readers = [pool.submit(_reader, path) for _ in range(READERS)]
+        writers = [pool.submit(_writer, path) for _ in range(WRITERS)]
+        written = sum(future.result() for future in writers)
+        # Ошибка «database is locked» у читателя всплывёт здесь.
+        reads = [future.result() for future in readers]
+
+    with sqlite3.connect(path) as db:
+        assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        counter = db.execute('SELECT value FROM counter').fetchone()[0]
+        logged = db.execute('SELECT COUNT(*) FROM log').fetchone()[0]
+    db.close()
+    assert counter == logged == written == WRITERS * INCREMENTS, (
+        'Убедитесь, что одновременные транзакции записи не теряют'
+        ' обновления и не падают с «database is locked».'
+    )
+    assert len(reads) == READERS
@@ -0,0 +1,106 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.metrics import store
+
+
+def _without_csrf(html):
+    return re.sub(r'name="csrfmiddlewaretoken" value="\w+"', '', html)
+
+
+def _pages(client, url):
+    with override_settings(BLOG_STREAMING=False):
+        plain = client.get(url)
+    caches['default'].clear()
+    with override_settings(BLOG_STREAMING=True):
+        streamed = client.get(url)
+        assert streamed.streaming, (
+            'Убедитесь, что при `BLOG_STREAMING = True` страница отдаётся'
+            ' StreamingHttpResponse.'
+        )
+        chunks = [
+            chunk.decode() if isinstance(chunk, bytes) else chunk
+            for chunk in streamed.streaming_content
+        ]
+    return plain, streamed, chunks
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_list_pages_stream_post_cards(
+        user_client, user, many_posts_with_published_locations, url_name):
+    post = many_posts_with_published_locations[0]
+    url = {
+        'index': '/',
+        'category': f'/category/{post.category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    plain, streamed, chunks = _pages(user_client, url)
+    assert streamed.status_code == HTTPStatus.OK
+    assert ''.join(chunks) == plain.content.decode(), (
+        'Убедитесь, что потоковый ответ совпадает с обычным.'
+    )
+    assert '<head>' in chunks[0] and 'card-title' not in chunks[0], (
+        'Убедитесь, что начало страницы отдаётся до карточек публикаций.'
+    )
+    assert sum('card-title' in chunk for chunk in chunks) > 1, (
+        'Убедитесь, что карточки публикаций отдаются отдельными частями.'
+    )
+
+
+@pytest.mark.django_db
+def test_detail_page_streams_comments(
+        user_client, mixer, user, post_with_published_location):
+    mixer.cycle(5).blend(
+        'blog.Comment', post=post_with_published_location, author=user,
+    )
+    url = f'/posts/{post_with_published_location.id}/'
+    plain, _, chunks = _pages(user_client, url)
+    assert _without_csrf(''.join(chunks)) == _without_csrf(
+        plain.content.decode()
+    )
+    assert sum('name="comment_' in chunk for chunk in chunks) == 5
+
+
+@pytest.mark.django_db
+def test_streamed_page_is_cached_for_anonymous(
+        client, post_with_published_location):
+    with override_settings(BLOG_STREAMING=True):
+        first = client.get('/')
+        content = b''.join(first.streaming_content)
+        second = client.get('/')
+    assert not second.streaming, (
+        'Убедитесь, что отданная потоком страница попадает в кэш.'
+    )
+    assert second.content == content
+
+
+@pytest.mark.django_db
+def test_page_rendered_while_streaming(
+        user_client, many_posts_with_published_locations):
+    store.reset()
+    with override_settings(BLOG_STREAMING=True):
+        response = user_client.get('/')
+        chunks = iter(response.streaming_content)
+        with CaptureQueriesContext(connection) as head_queries:
+            head = next(chunks).decode()
+        with CaptureQueriesContext(connection) as body_queries:
+            body = b''.join(chunks).decode()
+    assert '<head>' in head and 'card-title' not in head
+    assert not head_queries.captured_queries, (
+        'Убедитесь, что начало страницы отдаётся до отрисовки блоков'
+        ' с данными из базы.'
+    )
+    assert body_queries.captured_queries and 'card-title' in body
+    key = ('db_queries_total', (('route', 'blog:index'),))
+    assert store.counters[key] >= len(body_queries.captured_queries), (
+        'Убедитесь, что запросы во время отправки ответа попадают'
+        ' в метрики.'
+    )
+    store.reset()
@@ -0,0 +1,83 @@
+"""
+Разбор русского текста и замер его скорости на корпусе db.json.
+
+Путь к JSON-отчёту с числом слов в секунду задаёт переменная окружения
+BENCH_TEXT_REPORT, число проходов по корпусу — BENCH_TEXT_ROUNDS.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from blog.text_analysis import STOPWORDS, analyze, stem, tokenize
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / 'db.json'
+
+
+@pytest.mark.parametrize('words, expected', [
+    (['прогулка', 'прогулки', 'прогулке', 'прогулками'], 'прогулк'),
+    (['комета', 'кометы', 'комету', 'кометой'], 'комет'),
+    (['читающий', 'читаешь'], 'чита'),
+    (['красивейший', 'красивые', 'красивая'], 'красив'),
+    (['путешествия', 'путешествий', 'путешествиями'], 'путешеств'),
+])
+def test_stem_conflates_word_forms(words, expected):
+    assert {stem(word) for word in words} == {expected}, (
+        'Убедитесь, что формы одного слова сводятся к общей основе.'
+    )
+
+
+def test_analyze_normalizes_and_drops_stopwords():
+    assert tokenize('Ёлка, ЁЖИК и run_fast!') == [
+        'елка', 'ежик', 'и', 'run_fast'
+    ]
+    assert analyze('Ёжики и ёлки, но не Python 3') == [
+        'ежик', 'елк', 'python', '3'
+    ]
+    assert all(word == word.replace('ё', 'е') for word in STOPWORDS)
+
+
+def _corpus():
+    with open(CORPUS_PATH, encoding='utf-8') as fh:
+        records = json.load(fh)
+    return [
+        value
+        for record in records
+        if record['model'].startswith('blog.')
+        for value in record['fields'].values()
+        if isinstance(value, str)
+    ]
+
+
+def test_analyzer_throughput():
+    texts = _corpus()
+    rounds = int(os.environ.get('BENCH_TEXT_ROUNDS', 20))
+    stem.cache_clear()
+    tokens = sum(len(tokenize(text)) for text in texts) * rounds
+
+    started = time.perf_counter()
+    cold = [analyze(text) for text in texts]
+    cold_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(rounds):
+        warm = [analyze(text) for text in texts]
+    warm_time = time.perf_counter() - started
+
+    assert warm == cold
+    info = stem.cache_info()
+    assert info.hits > info.misses, (
+        'Убедитесь, что основы слов берутся из кэша.'
+    )
+    report = {
+        'texts': len(texts),
+        'tokens': tokens,
+        'cold_tokens_per_second': round(tokens / rounds / cold_time),
+        'warm_tokens_per_second': round(tokens / warm_time),
+        'stem_cache': info._asdict(),
+    }
+    path = os.environ.get('BENCH_TEXT_REPORT')
+    if path:
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
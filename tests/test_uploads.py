@@ -0,0 +1,110 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image, ImageFile
+
+from blog.forms import PostForm
+from blog.models import Post
+from blog.uploads import LimitedTemporaryFileUploadHandler
+
+
+def _image_file(size, image_format='PNG', mode='1', name=None, **options):
+    data = BytesIO()
+    Image.new(mode, size).save(data, image_format, **options)
+    return SimpleUploadedFile(
+        name or f'photo.{image_format.lower()}', data.getvalue()
+    )
+
+
+def _exif():
+    exif = Image.Exif()
+    exif[0x010F] = 'Фотокамера'
+    exif[0x0112] = 6
+    return exif.tobytes()
+
+
+@pytest.fixture
+def form_data(published_category, published_location):
+    return {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': (timezone.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
+        'category': published_category.pk,
+        'location': published_location.pk,
+    }
+
+
+def _image_errors(form_data, upload):
+    form = PostForm(form_data, {'image': upload})
+    return form.errors.get('image', [])
+
+
+@pytest.mark.django_db
+def test_oversized_image_rejected_by_header(form_data, monkeypatch):
+    upload = _image_file((8000, 6500))
+    assert upload.size < 1024 * 1024
+
+    def fail_load(self):
+        raise AssertionError('Пиксели изображения разворачиваются.')
+
+    monkeypatch.setattr(ImageFile.ImageFile, 'load', fail_load)
+    errors = _image_errors(form_data, upload)
+    assert errors and 'мегапикселей' in errors[0], (
+        'Убедитесь, что фото больше BLOG_UPLOAD_MAX_PIXELS отклоняется'
+        ' по заголовку, без разбора картинки.'
+    )
+
+
+@pytest.mark.django_db
+def test_upload_limits(form_data):
+    with override_settings(BLOG_UPLOAD_MAX_BYTES=1000):
+        errors = _image_errors(
+            form_data, _image_file((400, 400), 'JPEG', 'RGB', quality=100)
+        )
+        assert errors and 'Файл больше' in errors[0]
+    errors = _image_errors(form_data, _image_file((10, 10), 'BMP', 'RGB'))
+    assert errors and 'BMP' in errors[0], (
+        'Убедитесь, что принимаются только разрешённые форматы.'
+    )
+    errors = _image_errors(
+        form_data, SimpleUploadedFile('photo.jpg', b'not an image')
+    )
+    assert errors
+    assert not _image_errors(form_data, _image_file((10, 10)))
+
+
+@override_settings(BLOG_UPLOAD_MAX_BYTES=100)
+def test_upload_handler_stops_writing_after_limit():
+    handler = LimitedTemporaryFileUploadHandler()
+    handler.new_file('image', 'photo.jpg', 'image/jpeg', 250)
+    for start in range(0, 250, 50):
+        handler.receive_data_chunk(b'x' * 50, start)
+    upload = handler.file_complete(250)
+    assert upload.size == 250
+    assert len(upload.read()) == 100, (
+        'Убедитесь, что загрузка сверх лимита не пишется на диск.'
+    )
+    upload.close()
+
+
+@pytest.mark.django_db
+def test_exif_stripped_on_upload(
+        tmp_path, user_client, form_data):
+    upload = _image_file(
+        (300, 200), 'JPEG', 'RGB', name='photo.jpg', exif=_exif()
+    )
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        user_client.post('/posts/create/', {**form_data, 'image': upload})
+        post = Post.objects.get()
+        with Image.open(post.image.path) as image:
+            assert not image.getexif(), (
+                'Убедитесь, что EXIF удаляется из загруженного фото.'
+            )
+            assert image.format == 'JPEG'
+            assert image.size == (200, 300), (
+                'Убедитесь, что фото повёрнуто по метке ориентации.'
+            )
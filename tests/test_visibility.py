@@ -0,0 +1,76 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def recent_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(minutes=1),
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.mark.django_db
+def test_published_queryset(
+        recent_post, hidden_post, future_posts,
+        posts_with_unpublished_category):
+    assert list(Post.objects.published()) == [recent_post], (
+        'Убедитесь, что `Post.objects.published()` возвращает только'
+        ' опубликованные посты опубликованных категорий с наступившей'
+        ' датой публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_detail_shows_post_published_today(client, recent_post):
+    response = client.get(f'/posts/{recent_post.id}/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что пост, опубликованный сегодня, виден на странице'
+        ' публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_detail_rejects_hidden_post_in_lookup_query(
+        another_user_client, user_client, hidden_post,
+        django_assert_num_queries):
+    url = f'/posts/{hidden_post.id}/'
+    another_user_client.get(url)
+    with django_assert_num_queries(3) as captured:
+        response = another_user_client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    post_queries = [
+        q['sql'] for q in captured.captured_queries
+        if 'FROM "blog_post"' in q['sql']
+    ]
+    assert len(post_queries) == 1 and 'is_published' in post_queries[0], (
+        'Убедитесь, что скрытая публикация отсекается условием'
+        ' в самом запросе поиска поста.'
+    )
+    assert user_client.get(url).status_code == HTTPStatus.OK, (
+        'Убедитесь, что автор видит свою скрытую публикацию.'
+    )
+
+
+@pytest.mark.django_db
+def test_profile_hides_unpublished_posts_from_visitors(
+        client, user_client, user, recent_post, hidden_post):
+    url = f'/profile/{user.username}/'
+    assert list(client.get(url).context['page_obj']) == [recent_post], (
+        'Убедитесь, что посетители профиля видят только опубликованные'
+        ' посты автора.'
+    )
+    assert len(user_client.get(url).context['page_obj']) == 2